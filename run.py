@@ -1,26 +1,22 @@
-import os, json, argparse, html
-import pandas as pd
+import os, re, json, argparse, html, time
+from collections import Counter
 from dotenv import load_dotenv
 from utils.confluence_api import ConfluenceAPI
-from utils.adf import build_tasks_table_adf, build_tasks_page_doc, adf_p, adf_text
-from typing import Dict, List, Any
+from utils.sync_plan import compile_plan, execute_plan, save_plan, load_plan, describe
+from utils.journal import Journal
+from utils.concurrency import AdaptiveLimiter
+from utils.transport import make_transport
+from utils.plan_row import PlanRow, PageType, plan_rows
+from utils.tasks import TaskIndex, load_task_index, task_fingerprints
+from utils.task_table import TaskTables, BACKENDS, part_count
+from utils.adf import AdfJson, adf_p
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils.page_index import PageIndex
 
 REQ_PLAN_COLS = ["Parent Page","Page Title","Page Type","Code / Ref","Description / Notes","Complexity","Mode Applicability","Validation / Cleanup Flag","Labels","Recommended Action"]
 
-HEADER_MAP = {
-    "Task ID":"ID","Task Title":"Title","Task Description":"Desc","Complexity":"CX",
-    "Primary Role":"Role","Predecessors":"Dep","Client Dependencies":"Client Deps",
-    "Deliverables":"Deliverables","Acceptance Criteria":"Acceptance",
-    "ID":"ID","Title":"Title","Desc":"Desc","CX":"CX","Role":"Role","Dep":"Dep",
-    "Client Deps":"Client Deps","Acceptance":"Acceptance",
-}
-DROP_COLS = {"Orchestration Integration","Monitoring & Alerting","Schedule / Frequency"}
-WIDTHS = {  # % hints (Confluence honors <colgroup> in storage XHTML)
-    "Task ID": 8, "Task Title": 18, "Task Description": 34,
-    "Primary Role": 8, "Complexity": 6, "Predecessors": 8,
-    "Client Dependencies": 10, "Deliverables": 8, "Acceptance Criteria": 10,
-}
-
 def _esc(s) -> str:
     return html.escape("" if s is None else str(s))
 
@@ -33,154 +29,67 @@ def _complexity_code(val: str) -> str:
         "high": "H", "h": "H",
     }.get(m, (val or "").strip())
 
-def _cx_code(v: str) -> str:
-    """Normalize complexity to codes: L, M, H (fallback to original)."""
-    m = (v or "").strip().lower()
-    return {"low":"L","l":"L","medium":"M","m":"M","high":"H","h":"H"}.get(m, (v or "").strip())
-
-def normalize_tasks_df(df: pd.DataFrame, option_ref: str) -> list[dict]:
-    """Normalize tasks DataFrame to standardized format for ADF table."""
-    x = df[df.get("OptionRef","").astype(str).str.strip() == option_ref].copy()
-    if x.empty: return []
-    x = x.drop(columns=[c for c in DROP_COLS if c in x.columns], errors="ignore").fillna("")
-    rows = []
-    for _, s in x.iterrows():
-        r = {k:"" for k in ["ID","Title","Desc","CX","Role","Dep","Client Deps","Deliverables","Acceptance"]}
-        for src, tgt in HEADER_MAP.items():
-            if src in s.index: r[tgt] = str(s[src]).strip()
-        r["CX"] = _cx_code(r["CX"])
-        rows.append(r)
-    return rows
-
-def render_tasks_table_adf(tasks_df: pd.DataFrame, option_ref: str) -> Dict[str, Any]:
-    """Generate ADF format for tasks table using clean utility functions."""
-    df = tasks_df[tasks_df.get("OptionRef") == option_ref].copy()
-    if df.empty:
-        return adf_p(f"No tasks found for OptionRef {option_ref}.")
-
-    preferred = [
-        "Task ID","Task Title","Task Description","Complexity","Primary Role","Notes",
-        "Predecessors","Client Dependencies","Deliverables","Acceptance Criteria",
-        "MVP","Production","Enterprise",  # only kept if present
-    ]
-    cols = [c for c in preferred if c in df.columns and c not in DROP_COLS]
-    df = df[cols].replace({pd.NA: "", None: ""}).fillna("")
-
-    # Convert DataFrame rows to the format expected by build_tasks_table_adf
-    rows = []
-    for _, r in df.iterrows():
-        row_dict = {}
-        for c in df.columns:
-            v = r[c]
-            if c == "Complexity":
-                code = _complexity_code(v)
-                row_dict["CX"] = code  # Use short alias
-            elif c == "Task ID":
-                row_dict["ID"] = str(v or "")
-            elif c == "Task Title":
-                row_dict["Title"] = str(v or "")
-            elif c == "Task Description":
-                row_dict["Desc"] = str(v or "")
-            elif c == "Primary Role":
-                row_dict["Role"] = str(v or "")
-            elif c == "Predecessors":
-                row_dict["Dep"] = str(v or "")
-            elif c == "Client Dependencies":
-                row_dict["Client Deps"] = str(v or "")
-            elif c == "Deliverables":
-                row_dict["Deliverables"] = str(v or "")
-            elif c == "Acceptance Criteria":
-                row_dict["Acceptance"] = str(v or "")
-        rows.append(row_dict)
-
-    return build_tasks_table_adf(rows)
-
 def esc(s): return _esc(s)
 
 def _as_storage_html(value: str) -> str:
     """
-    Accepts plain text, markdown-ish, or HTML.
+    Accepts plain text, markdown (see utils/markdown.py), or HTML.
     If it *looks* like HTML (starts with '<'), pass through.
-    Otherwise, wrap lines in <p> and bullets into <ul>/<li> so it renders nicely.
+    Otherwise convert the markdown; results are memoized, since descriptions repeat across rows.
     Returns XHTML suitable for Confluence 'storage' representation.
     """
     txt = (value or "").strip()
     if txt.startswith("<"):  # treat as HTML already
         return txt
-    # very small markdown-to-HTML for bullets/headings
-    lines = [l.rstrip() for l in txt.splitlines() if l.strip() != ""]
-    out = []
-    in_ul = False
-    for line in lines:
-        if line.lstrip().startswith(("-", "*")):
-            if not in_ul:
-                out.append("<ul>")
-                in_ul = True
-            out.append(f"<li>{html.escape(line.lstrip('-* ').strip())}</li>")
-        else:
-            if in_ul:
-                out.append("</ul>")
-                in_ul = False
-            out.append(f"<p>{html.escape(line)}</p>")
-    if in_ul:
-        out.append("</ul>")
-    return "".join(out)
-
-def render_tasks_table(tasks_df: pd.DataFrame, option_ref: str) -> str:
-    df = tasks_df[tasks_df.get("OptionRef") == option_ref].copy()
-    if df.empty:
-        return f"<p><em>No tasks found for OptionRef {html.escape(option_ref)}.</em></p>"
-
-    preferred = [
-        "Task ID","Task Title","Task Description","Complexity","Primary Role","Notes",
-        "Predecessors","Client Dependencies","Deliverables","Acceptance Criteria",
-        "MVP","Production","Enterprise",  # only kept if present
-    ]
-    cols = [c for c in preferred if c in df.columns and c not in DROP_COLS]
-    df = df[cols].replace({pd.NA: "", None: ""}).fillna("")
-
-    # Width hints (no inline CSS)
-    colgroup = "<colgroup>" + "".join(
-        f'<col width="{WIDTHS.get(c, 8)}%"/>'
-        for c in df.columns
-    ) + "</colgroup>"
-
-    thead = "".join(
-        f"<th>{_esc(HEADER_ALIASES.get(c, c))}</th>"
-        for c in df.columns
-    )
-
-    body_rows = []
-    for _, r in df.iterrows():
-        tds = []
-        for c in df.columns:
-            v = r[c]
-            if c == "Complexity":
-                code = _complexity_code(v)
-                long = {"L":"Low","M":"Medium","H":"High"}.get(code, str(v or ""))
-                tds.append(f'<td><span title="{_esc(long)}">{_esc(code)}</span></td>')
-            else:
-                tds.append(f"<td>{_esc(v)}</td>")
-        body_rows.append("<tr>" + "".join(tds) + "</tr>")
-
-    # <small> shrinks font universally (works even if styles are stripped)
-    return (
-        "<small><table>"
-        f"{colgroup}"
-        f"<thead><tr>{thead}</tr></thead>"
-        f"<tbody>{''.join(body_rows)}</tbody>"
-        "</table></small>"
-    )
-
-def build_body(row, tasks_df: pd.DataFrame = None, use_prosemirror: bool = False):
-    page_type = row.get("Page Type","")
-    desc = _as_storage_html(row.get("Description / Notes",""))
-    complexity = row.get("Complexity","")
-    modes = row.get("Mode Applicability","")
-    flag = row.get("Validation / Cleanup Flag","")
-    code = row.get("Code / Ref","")
-
-    if page_type == "Subcomponent":
+    from utils.markdown import to_storage
+    return to_storage(txt)
+
+def task_part_count(tasks: TaskIndex, option_ref: str, use_prosemirror: bool, budget: Tuple[int, int]) -> int:
+    """How many pages the Tasks page of option_ref needs to stay within budget."""
+    return part_count(task_tables(tasks).get(option_ref), BACKENDS["adf" if use_prosemirror else "storage"], budget)
+
+def task_tables(tasks: TaskIndex) -> TaskTables:
+    """This process's TaskTable cache for tasks, so each OptionRef is normalized once per run."""
+    tables = _RENDER.get("tables")
+    if tables is None or tables.tasks is not tasks:
+        tables = _RENDER["tables"] = TaskTables(tasks)
+    return tables
+
+def _part(row) -> Tuple[int, int]:
+    """(k, n) from the row's Part column ("2/3"), (0, 0) for an unsplit page."""
+    k, _, n = (row.get("Part") or "").partition("/")
+    return (int(k), int(n)) if k.isdigit() and n.isdigit() else (0, 0)
+
+def _option_table_compact(cells: List[Tuple[str, str]]) -> str:
+    """Key/value table styled by Confluence's own table classes instead of inline styles."""
+    trs = "".join(f'<tr><th class="confluenceTh">{k}</th><td class="confluenceTd">{v}</td></tr>' for k, v in cells)
+    return f'<table class="confluenceTable"><colgroup><col width="25%"/><col width="75%"/></colgroup><tbody>{trs}</tbody></table>'
+
+def _info_panel(inner: str) -> str:
+    return f'<ac:structured-macro ac:name="info"><ac:rich-text-body>{inner}</ac:rich-text-body></ac:structured-macro>'
+
+def build_body(row, tasks: TaskIndex = None, use_prosemirror: bool = False, budget: Tuple[int, int] = (0, 0),
+               compact: bool = False):
+    """
+    Page body of a plan row. compact renders Option pages without the inline styles (Confluence
+    table classes and an info panel instead) and the template whitespace; the content is the same.
+    """
+    page_type = row.page_type
+    desc = _as_storage_html(row.description)
+    complexity = row.complexity
+    modes = row.modes
+    flag = row.flag
+    code = row.code
+
+    if page_type == "Option" and compact:
+        body = (f"<h2>Option Overview</h2>{desc}"
+                + _option_table_compact([("Option Ref", f"<code>{esc(code)}</code>"),
+                                         ("Complexity", f"<code>{_complexity_code(complexity)}</code>"),
+                                         ("Mode Applicability", esc(modes)),
+                                         ("Validation / Cleanup", esc(flag))])
+                + _info_panel(f"<p><strong>Next Steps:</strong> See child page <strong>Tasks – {esc(code)}</strong> "
+                              "for detailed task breakdown and implementation guidance.</p>"))
+    elif page_type == "Subcomponent":
         body = f"""
 <h2>Overview</h2>
 {desc}
@@ -232,10 +141,9 @@ def build_body(row, tasks_df: pd.DataFrame = None, use_prosemirror: bool = False
         # Tasks page with intro and tasks table
         if use_prosemirror:
             # ADF/ProseMirror JSON format
-            if tasks_df is not None and not tasks_df.empty:
-                # Use the new normalization function for clean data processing
-                rows = normalize_tasks_df(tasks_df, code)
-                body = build_tasks_page_doc(code, rows)
+            if tasks:
+                # serialized directly from the shared task table, no dict tree
+                body = BACKENDS["adf"].render(task_tables(tasks).get(code), budget, part=_part(row)[0])
             else:
                 # Fallback placeholder for ADF
                 body = {
@@ -248,10 +156,11 @@ def build_body(row, tasks_df: pd.DataFrame = None, use_prosemirror: bool = False
                 }
         else:
             # HTML storage format
-            intro_html = f"<p><strong>Tasks – {esc(code)}</strong></p>"
+            k, n = _part(row)
+            intro_html = f"<p><strong>Tasks – {esc(code)}</strong>{f' (part {k} of {n})' if k else ''}</p>"
             
-            if tasks_df is not None and not tasks_df.empty:
-                tasks_html = render_tasks_table(tasks_df, code)
+            if tasks:
+                tasks_html = BACKENDS["storage"].render(task_tables(tasks).get(code), budget, part=k)
                 body = intro_html + tasks_html  # DO NOT html.escape() this
             else:
                 # Fallback placeholder table
@@ -279,6 +188,133 @@ def build_body(row, tasks_df: pd.DataFrame = None, use_prosemirror: bool = False
                 body = intro_html + placeholder_html  # DO NOT html.escape() this
     return body
 
+def _read_plan(path: str) -> List[PlanRow]:
+    with open(path) as f:
+        return plan_rows(json.load(f))
+
+def cached_input(args, path: str, kind: str, loader):
+    """loader(path), served from the --input-cache while the file is unchanged."""
+    if not args.input_cache or not os.path.isfile(path):
+        return loader(path)
+    from utils.input_cache import InputCache
+    return InputCache(args.input_cache).load(path, kind, loader)
+
+def load_tasks(args) -> TaskIndex:
+    """The tasks CSV by OptionRef: in memory, or from the SQLite --tasks-db for very large catalogs."""
+    if not args.inject_tasks:
+        return {}
+    if args.tasks_db:
+        from utils.tasks_store import TasksStore
+        return TasksStore.open(args.tasks_db, args.tasks)
+    return cached_input(args, args.tasks, "tasks", load_task_index)
+
+def load_rows(args) -> List[PlanRow]:
+    """Plan rows filtered by --only-types, parents' types first."""
+    rows = cached_input(args, args.plan, "plan", _read_plan)
+
+    only_types = [t.strip() for t in args.only_types.split(",") if t.strip()]
+    if only_types:
+        rows = [r for r in rows if r.page_type in only_types]
+
+    order_map = {"Subcomponent":0,"Option":1,"Tasks":2}
+    rows.sort(key=lambda r: order_map.get(r.page_type, 99))
+    return rows
+
+DEFAULT_TASK_BUDGET = (200, 256 * 1024)  # (rows, bytes) per tasks table; --tasks-max-rows / --tasks-max-kb
+
+def task_budget(args) -> Tuple[int, int]:
+    return args.tasks_max_rows, args.tasks_max_kb * 1024
+
+def split_task_pages(api, rows: List[PlanRow], tasks: TaskIndex, use_prosemirror: bool,
+                     budget: Tuple[int, int]) -> List[PlanRow]:
+    """
+    Tasks pages over budget become a group: the page itself holds part 1 and child pages
+    "<title> (k/n)" hold the rest. When the number of parts changed since the last run, the
+    existing part pages are found under their old titles and renamed by the update.
+    """
+    out = []
+    for row in rows:
+        out.append(row)
+        if row.page_type != PageType.TASKS or row.get("Part"):
+            continue
+        n = task_part_count(tasks, (row.code or "").strip(), use_prosemirror, budget)
+        if n < 2:
+            continue
+        title = (row.title or "").strip()
+        base = row.to_dict()
+        out[-1] = PlanRow.from_dict(dict(base, Part=f"1/{n}"))
+        previous = {}
+        main = api.find_page_by_title(title)
+        if main:
+            part_title = re.compile(rf"{re.escape(title)} \((\d+)/(\d+)\)")
+            for child in api.list_children(main["id"]):
+                m = part_title.fullmatch(child.get("title", ""))
+                if m: previous[int(m.group(1))] = child["title"]
+        for k in range(2, n + 1):
+            part = dict(base, **{"Parent Page": title, "Page Title": f"{title} ({k}/{n})", "Part": f"{k}/{n}"})
+            if previous.get(k, part["Page Title"]) != part["Page Title"]:
+                part["Previous Title"] = previous[k]
+            out.append(PlanRow.from_dict(part))
+        for k in sorted(k for k in previous if k > n):
+            print(f"[WARN] {previous[k]} is no longer needed ({title} now has {n} parts); archive it in Confluence")
+    return out
+
+def plan(api, args, completed=None, rows=None, tasks=None) -> List[Dict[str, Any]]:
+    """Plan phase: resolve each plan row into an action."""
+    rows = load_rows(args) if rows is None else rows
+    if args.inject_tasks and args.tasks_split == "pages":
+        rows = split_task_pages(api, rows, load_tasks(args) if tasks is None else tasks, args.prosemirror, task_budget(args))
+    actions = compile_plan(rows, api, args.root, args.root_id,
+                           update=args.update, move=args.move, limit=args.limit, completed=completed,
+                           workers=args.workers)
+    if args.plan_out:
+        save_plan(actions, args.plan_out)
+        print(f"Wrote {len(actions)} actions to {args.plan_out}")
+    return actions
+
+_RENDER: Dict[str, Any] = {}
+
+def init_render(tasks: TaskIndex, use_prosemirror: bool, budget: Tuple[int, int] = (0, 0), compact: bool = False,
+                markdown_memo: str = "", worker: bool = False):
+    """Set the render inputs once per process (also the initializer of render worker processes)."""
+    _RENDER.update(tasks=tasks, prosemirror=use_prosemirror, budget=budget, compact=compact)
+    if markdown_memo:
+        from utils import markdown
+        markdown.load_memo(markdown_memo)
+        if worker:
+            # Runs as the worker process exits (pool shutdown); the parent merges the parts into the memo.
+            from multiprocessing.util import Finalize
+            Finalize(None, markdown.save_memo, args=(markdown.part_path(markdown_memo),),
+                     kwargs={"new_only": True}, exitpriority=10)
+
+def render_row(row) -> Any:
+    return build_body(row, _RENDER["tasks"], _RENDER["prosemirror"], _RENDER["budget"], _RENDER["compact"])
+
+def apply_action(api, action: Dict[str, Any], parent_id, body_content: Any, use_prosemirror: bool) -> Dict[str, Any]:
+    """Execute one plan action with its pre-rendered body. Only writes happen here; every lookup was done while planning."""
+    op, title, labels = action["op"], action["title"], action["labels"]
+    if op == "skip":
+        return {"page_id": action["page_id"]}
+    if op == "move":
+        api.move_page(action["page_id"], parent_id, title)
+        return {"page_id": action["page_id"]}
+
+    if op == "update":
+        if use_prosemirror and isinstance(body_content, (dict, AdfJson)):
+            # ADF format - use proper ADF update method
+            page = api.update_page_adf(action["page_id"], title, body_content, version=action.get("version"))
+        else:
+            # HTML storage format
+            page = api.update_page_body(action["page_id"], title, body_content, version=action.get("version"))
+        if labels: api.set_labels(action["page_id"], labels)
+    else:
+        if use_prosemirror and isinstance(body_content, (dict, AdfJson)):
+            # ADF format - created natively as atlas_doc_format, no follow-up update needed
+            page = api.create_page(title, "", parent_id=parent_id, labels=labels, adf_doc=body_content)
+        else:
+            page = api.create_page(title, body_content, parent_id=parent_id, labels=labels)
+    return {"page_id": page["id"], "version": (page.get("version") or {}).get("number")}
+
 def main():
     load_dotenv()
     p = argparse.ArgumentParser(description="Create/Update Confluence pages with optional Tasks injection.")
@@ -289,84 +325,268 @@ def main():
     p.add_argument("--root-id", default="", help="Explicit Confluence page ID for root parent")
     p.add_argument("--dry_run", action="store_true")
     p.add_argument("--update", action="store_true")
+    p.add_argument("--move", action="store_true", help="Re-parent existing pages whose parent differs from the plan")
     p.add_argument("--only-types", default="", help="Comma list: Subcomponent,Option,Tasks")
     p.add_argument("--limit", type=int, default=0)
     p.add_argument("--inject_tasks", action="store_true", help="Inject tasks table into Tasks pages from CSV")
     p.add_argument("--prosemirror", action="store_true", help="Use ProseMirror JSON format instead of HTML storage")
+    p.add_argument("--compact", action="store_true", help="Smaller storage bodies for Option pages only: Confluence table classes instead of inline styles, no template whitespace")
+    p.add_argument("--tasks-max-rows", type=int, default=DEFAULT_TASK_BUDGET[0], help="Task rows per table before a Tasks page is split (0 = no limit)")
+    p.add_argument("--tasks-max-kb", type=int, default=DEFAULT_TASK_BUDGET[1] // 1024, help="KiB of table rows per table before a Tasks page is split (0 = no limit)")
+    p.add_argument("--tasks-split", choices=["expand", "pages"], default="expand",
+                   help="Split oversized task tables into expand sections on the page, or into numbered child pages")
+    p.add_argument("--index", default="", help="Path to a local page index snapshot; refreshed incrementally and used for title lookups")
+    p.add_argument("--full-refresh", action="store_true", help="Re-crawl the space instead of a delta refresh of --index")
+    p.add_argument("--plan-out", default="", help="Write the compiled action plan to this JSON file")
+    p.add_argument("--apply", default="", help="Apply a previously written action plan instead of planning")
+    p.add_argument("--workers", type=int, default=16, help="Parallel writers used to apply the plan (in-flight requests are capped adaptively)")
+    p.add_argument("--max-inflight", type=int, default=16, help="Upper bound for the adaptive in-flight request limit")
+    p.add_argument("--target-latency", type=float, default=2.0, help="Seconds; slower responses shrink the in-flight limit")
+    p.add_argument("--transport", default="requests", choices=["requests", "http2"], help="HTTP backend; http2 (experimental) multiplexes requests over a few connections, but was not faster in scripts/bench_transport.py")
+    p.add_argument("--cassette", default="", help="Cassette file (.jsonl or .jsonl.gz) of recorded HTTP exchanges")
+    p.add_argument("--cassette-mode", choices=["record", "replay"], help="Record a live run into --cassette (overwriting it), or replay it offline; required with --cassette")
+    p.add_argument("--cassette-timing", default="collapse", choices=["collapse", "preserve"], help="Replay with recorded latencies or none")
+    p.add_argument("--http-cache", default=os.getenv("CONFLUENCE_HTTP_CACHE",""), help="SQLite file caching GET responses between runs")
+    p.add_argument("--cache-ttl", type=float, default=0, help="Seconds a cached GET is reused without revalidation (0 = always revalidate)")
+    p.add_argument("--cache-max-mb", type=int, default=256, help="Size bound for --http-cache (LRU eviction)")
+    p.add_argument("--tasks-db", default="", help="SQLite store for --tasks, (re)imported in chunks when the CSV changes; rows are fetched per OptionRef")
+    p.add_argument("--input-cache", default=os.getenv("CONFLUENCE_INPUT_CACHE", ""), help="Directory caching parsed --plan/--tasks (pickles) between runs, e.g. .cache/inputs; off by default")
+    p.add_argument("--journal", default="data/.sync_journal.jsonl", help="Append-only record of completed actions")
+    p.add_argument("--resume", action="store_true", help="Continue an interrupted run from --journal instead of starting over")
+    p.add_argument("--render-workers", type=int, default=2, help="Threads (or processes) rendering page bodies ahead of the publishers")
+    p.add_argument("--render-processes", action="store_true", help="Render in worker processes instead of threads (CPU-heavy task tables)")
+    p.add_argument("--render-ahead", type=int, default=64, help="Max rendered bodies waiting to be published (bounds memory)")
+    p.add_argument("--watch", action="store_true", help="After the first sync, stay running and push pages affected by edits to --plan/--tasks")
+    p.add_argument("--watch-interval", type=float, default=1.0, help="Polling interval in seconds when inotify is unavailable")
+    p.add_argument("--shards", type=int, default=1, help="Sync top-level components (F.01, F.02, ...) in this many processes")
     args = p.parse_args()
-
-    api = ConfluenceAPI(
+    if args.cassette and not args.cassette_mode:
+        p.error("--cassette needs --cassette-mode record or replay")
+
+    if args.shards > 1:
+        if args.apply or args.plan_out or args.cassette or args.watch:
+            raise SystemExit("--shards cannot be combined with --apply, --plan-out, --cassette or --watch")
+        return sync_sharded(args)
+    if args.watch and args.apply:
+        raise SystemExit("--watch re-plans from --plan; it cannot be combined with --apply")
+
+    api = make_api(args)
+    index = None
+    if args.index or args.watch:
+        from utils.page_index import PageIndex
+    if args.index:
+        index = PageIndex.load(args.index, api.space_key, args.root_id)
+        if not args.apply:
+            stats = index.refresh(api, full=args.full_refresh)
+            index.save()
+            print(f"Index: {len(index.pages)} pages ({', '.join(f'{k}={v}' for k, v in stats.items() if v)})")
+        api.attach_index(index)
+    elif args.watch:
+        # Resident process: an in-memory index keeps every later lookup local.
+        index = PageIndex(api.space_key, args.root_id)
+        index.refresh(api, full=True)
+        api.attach_index(index)
+    counts, render_metrics = sync(api, args, args.journal, index=index)
+    if index is not None and index.path and not args.dry_run:
+        index.save()
+    print_summary(args, counts, dict(api.metrics(), **render_metrics))
+    if args.watch:
+        watch(api, args, index)
+    api.close()
+
+def watch(api, args, index: "PageIndex"):
+    """Stay resident and re-sync only the rows affected by edits to the plan JSON or tasks CSV."""
+    from utils.watch import FileWatcher, changed_rows, changed_option_refs, retry_titles
+    # Each push is a fresh, complete run over the affected rows; edits to existing pages are the point.
+    args = argparse.Namespace(**dict(vars(args), resume=False, plan_out="", limit=0, update=True))
+    rows = load_rows(args)
+    tasks = task_fingerprints(load_tasks(args))
+    retry: set = set()  # titles of rows whose pages failed in the last push
+    watcher = FileWatcher([args.plan] + ([args.tasks] if args.inject_tasks else []), interval=args.watch_interval)
+    print(f"Watching {', '.join(watcher.paths)} ({watcher.backend}); Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.wait()
+            t0 = time.monotonic()
+            try:
+                new_rows = load_rows(args)
+                new_tasks = task_fingerprints(load_tasks(args))
+                refs = changed_option_refs(tasks, new_tasks)
+                affected = {id(r) for r in changed_rows(rows, new_rows)}
+                affected |= {id(r) for r in new_rows if r.page_type == PageType.TASKS and (r.code or "").strip() in refs}
+                batch = [r for r in new_rows if id(r) in affected or (r.title or "").strip() in retry]  # parents first
+                if not batch:
+                    rows, tasks = new_rows, new_tasks
+                    print(f"[WATCH] {', '.join(os.path.basename(p) for p in sorted(changed))} changed; no pages affected")
+                    continue
+                index.refresh(api)  # pick up edits made in Confluence since the last push
+                failed: List[PlanRow] = []
+                counts, _ = sync(api, args, args.journal, index=index, rows=batch, failed=failed)
+                if index.path and not args.dry_run:
+                    index.save()
+            except Exception as e:
+                # A half-saved file or a network error must not end the session. The last good
+                # rows/tasks are kept, so the next save diffs against them and retries this batch.
+                print(f"[WATCH] {type(e).__name__}: {e}; waiting for the next save")
+                continue
+            # The baseline moves on, but pages that failed are pushed again with the next save.
+            rows, tasks, retry = new_rows, new_tasks, retry_titles(failed)
+            c = Counter(counts)
+            print(f"[WATCH] {len(batch)} rows: Created={c['create']} Updated={c['update']} Moved={c['move']} "
+                  f"Failed={c['failed']} in {time.monotonic() - t0:.1f}s"
+                  f"{f'; {len(retry)} rows retried with the next save' if retry else ''}")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def make_api(args, max_inflight: int = 0) -> ConfluenceAPI:
+    # Optional features import their modules only when enabled (see scripts/bench_startup.py).
+    email, token = os.getenv("CONFLUENCE_EMAIL","").strip(), os.getenv("CONFLUENCE_API_TOKEN","").strip()
+    transport = make_transport(args.transport, email, token)
+    if args.cassette:
+        from utils.cassette import open_cassette
+        transport = open_cassette(args.cassette_mode, args.cassette, transport, args.cassette_timing)
+    cache = None
+    if args.http_cache:
+        from utils.http_cache import HttpCache
+        cache = HttpCache(args.http_cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024)
+    return ConfluenceAPI(
         base_url=os.getenv("CONFLUENCE_BASE_URL","").strip(),
-        email=os.getenv("CONFLUENCE_EMAIL","").strip(),
-        api_token=os.getenv("CONFLUENCE_API_TOKEN","").strip(),
-        space_key=args.space.strip()
+        email=email,
+        api_token=token,
+        space_key=args.space.strip(),
+        limiter=AdaptiveLimiter(max_limit=max_inflight or args.max_inflight, target_latency=args.target_latency),
+        cache=cache,
+        transport=transport,
     )
 
-    with open(args.plan) as f:
-        rows = json.load(f)
-    tasks_df = pd.read_csv(args.tasks) if args.inject_tasks and os.path.exists(args.tasks) else pd.DataFrame()
-
-    only_types = [t.strip() for t in args.only_types.split(",") if t.strip()]
-    if only_types:
-        rows = [r for r in rows if r.get("Page Type") in only_types]
-
-    order_map = {"Subcomponent":0,"Option":1,"Tasks":2}
-    rows.sort(key=lambda r: order_map.get(r.get("Page Type"), 99))
-
-    def resolve_parent_id(parent_title):
-        if args.root_id and (not parent_title or parent_title == args.root):
-            return args.root_id
-        p = api.find_page_by_title(parent_title) or api.find_page_relaxed(parent_title)
-        if p: return p["id"]
-        if args.root_id: return args.root_id
-        root = api.find_page_by_title(args.root) or api.find_page_relaxed(args.root)
-        return root["id"] if root else None
-
-    created = updated = skipped = 0
-    for i, row in enumerate(rows, 1):
-        if args.limit and i > args.limit:
-            break
-        title = (row.get("Page Title") or "").strip()
-        parent_title = (row.get("Parent Page") or "").strip()
-        labels = [l.strip() for l in (row.get("Labels","") or "").split(";") if l.strip()]
-        if not title: continue
-
-        existing = api.find_page_by_title(title) or api.find_page_relaxed(title)
-        body_content = build_body(row, tasks_df if args.inject_tasks else pd.DataFrame(), args.prosemirror)
-
-        if existing:
-            if args.update:
-                if args.dry_run:
-                    print(f"[DRY][UPDATE] {title}")
-                else:
-                    if args.prosemirror and isinstance(body_content, dict):
-                        # ADF format - use proper ADF update method
-                        api.update_page_adf(existing["id"], title, body_content)
-                    else:
-                        # HTML storage format
-                        api.update_page_body(existing["id"], title, body_content)
-                    if labels: api.set_labels(existing["id"], labels)
-                updated += 1
-            else:
-                skipped += 1
-            continue
-
-        parent_id = resolve_parent_id(parent_title)
-        if args.dry_run:
-            print(f"[DRY][CREATE] '{title}' under '{parent_title}' (parent_id={parent_id})")
-            continue
-        
-        if args.prosemirror and isinstance(body_content, dict):
-            # ADF format - need to create page with ADF body
-            # For now, convert to JSON string (create_page doesn't support ADF directly)
-            body_html = json.dumps(body_content)
-            api.create_page(title, body_html, parent_id=parent_id, labels=labels)
-        else:
-            # HTML storage format
-            api.create_page(title, body_content, parent_id=parent_id, labels=labels)
-        created += 1
-
-    print(f"Done. Created={created} Updated={updated} Skipped={skipped}")
+def sync(api, args, journal_path: str, index=None, rows=None,
+         failed: Optional[List[PlanRow]] = None) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """
+    Plan (or load a saved plan) and, unless dry-running or only writing the plan, apply it.
+    Returns (op counts, render-stage metrics); the rows of failed or blocked actions are added to failed.
+    """
+    # Resuming a saved plan matches journal entries by seq; re-planning matches them by title.
+    done = Journal.load(journal_path) if args.resume else []
+    if done:
+        print(f"Resume: {len(done)} completed actions in {journal_path}")
+    # Loaded once: planning (split pages) and rendering share its normalized task tables.
+    tasks = load_tasks(args)
+    if args.apply:
+        actions = load_plan(args.apply)
+    else:
+        actions = plan(api, args, completed={e["title"]: e for e in done}, rows=rows, tasks=tasks)
+    if args.dry_run:
+        for a in actions:
+            if a["op"] != "skip": print(f"[DRY]{describe(a)}")
+        return dict(Counter(a["op"] for a in actions)), {}
+    if args.plan_out and not args.apply:
+        return {}, {}
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from utils.pipeline import RenderAhead
+    # Converted descriptions are kept next to the input cache, so the next run starts warm.
+    memo = os.path.join(args.input_cache, "markdown.pkl") if args.input_cache else ""
+    init_render(tasks, args.prosemirror, task_budget(args), args.compact, memo)
+    journal = Journal(journal_path, resume=args.resume)
+    journal.replay(index)
+    resumed = journal.by_seq() if args.apply else {}
+
+    # Render stage: bodies are rendered ahead (threads or processes) while the publish
+    # workers below are waiting on the network; render_ahead bounds how far ahead.
+    jobs = [(a["seq"], a["row"]) for a in actions if a["op"] in ("create", "update") and a["seq"] not in resumed]
+    if args.render_processes:
+        render_pool = ProcessPoolExecutor(args.render_workers, initializer=init_render,
+                                          initargs=(tasks, args.prosemirror, task_budget(args), args.compact, memo, True))
+    else:
+        render_pool = ThreadPoolExecutor(args.render_workers)
+    renderer = RenderAhead(jobs, render_row, render_pool, depth=args.render_ahead)
+    moved_to: Dict[int, Optional[str]] = {}  # seq of a move -> the parent it put the page under
+    def run_action(a, parent_id):
+        body = renderer.take(a["seq"], a["row"]) if a["op"] in ("create", "update") else None
+        result = apply_action(api, a, parent_id, body, args.prosemirror)
+        if a["op"] == "move": moved_to[a["seq"]] = parent_id
+        # An update chained after its page's move gets that page's own id as parent_id; what it
+        # journals is where the move put the page (None for a plain update).
+        target = parent_id if a["op"] in ("create", "move") else moved_to.get(a["after"])
+        if a["op"] != "skip": journal.record(a, result, target)
+        return result
+    try:
+        results, errors = execute_plan(actions, run_action, workers=args.workers, done=resumed)
+    finally:
+        renderer.close()
+        render_pool.shutdown(cancel_futures=True)
+        journal.close()
+        if memo:
+            from utils import markdown
+            if markdown.merge_parts(memo) or markdown.stats["misses"]: markdown.save_memo(memo)
+    by_seq = {a["seq"]: a for a in actions}
+    for seq, err in sorted(errors.items()):
+        print(f"[ERROR] #{seq} {by_seq[seq]['title']}: {err}")
+    if failed is not None: failed += [by_seq[seq]["row"] for seq in errors]
+    counts = Counter(a["op"] for a in actions if a["seq"] in results and a["seq"] not in resumed)
+    counts["failed"] = len(errors)
+    return dict(counts), renderer.metrics()
+
+def print_summary(args, counts: Dict[str, int], metrics: Dict[str, Any]):
+    c = Counter(counts)
+    if args.dry_run:
+        print(f"Plan. Create={c['create']} Update={c['update']} Move={c['move']} Skip={c['skip']}")
+    elif not (args.plan_out and not args.apply):
+        print(f"Done. Created={c['create']} Updated={c['update']} Moved={c['move']} Skipped={c['skip']} Failed={c['failed']}")
+    if args.dry_run or not (args.plan_out and not args.apply):
+        print("Metrics: " + " ".join(f"{k}={v}" for k, v in metrics.items()))
+
+def shard_journal(path: str, shard: int) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard}{ext}"
+
+def run_shard(args, shard: int, rows: List[PlanRow]):
+    """One shard in its own process: its own session, journal and slice of the in-flight budget."""
+    api = make_api(args, max_inflight=max(1, args.max_inflight // args.shards))
+    index = None
+    if args.index:
+        from utils.page_index import PageIndex
+        index = PageIndex.load(args.index, api.space_key, args.root_id)  # refreshed by the parent
+        api.attach_index(index)
+    counts, render_metrics = sync(api, args, shard_journal(args.journal, shard), index=index, rows=rows)
+    metrics = dict(api.metrics(), **render_metrics)
+    api.close()
+    return counts, metrics
+
+def sync_sharded(args):
+    """Partition the plan by top-level component and sync each partition in a separate process."""
+    from concurrent.futures import ProcessPoolExecutor
+    from utils.sharding import partition, component_of, merge_metrics
+    rows = load_rows(args)
+    parts = partition(rows, args.shards)
+    index = None
+    if args.index:
+        from utils.page_index import PageIndex
+        api = make_api(args)
+        index = PageIndex.load(args.index, api.space_key, args.root_id)
+        stats = index.refresh(api, full=args.full_refresh)
+        index.save()
+        print(f"Index: {len(index.pages)} pages ({', '.join(f'{k}={v}' for k, v in stats.items() if v)})")
+    for i, part in enumerate(parts):
+        comps = sorted({component_of(r) or "?" for r in part})
+        print(f"Shard {i}: {len(part)} rows ({', '.join(comps)})")
+
+    total: Counter = Counter()
+    metrics = []
+    with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+        futures = [pool.submit(run_shard, args, i, part) for i, part in enumerate(parts)]
+        for i, fut in enumerate(futures):
+            counts, m = fut.result()
+            total.update(counts)
+            metrics.append(m)
+            print(f"Shard {i}: " + " ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+    if index is not None:
+        if not args.dry_run:
+            index.refresh(api)  # pick up what the shards wrote
+            index.save()
+        api.close()
+    print_summary(args, total, merge_metrics(metrics))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""
+Parity and benchmark for the streaming ADF serializer.
+
+    python -m scripts.bench_adf_stream [--rows 20000] [--runs 3]
+
+Checks that tasks_page_doc_json() is byte-identical to json.dumps(build_tasks_page_doc()) on
+random task rows (quotes, backslashes, control characters, non-ASCII, markdown, missing keys;
+with and without a chunking budget), then
+compares time and peak traced memory of both for one page of --rows tasks. Exits 1 on any
+parity mismatch.
+"""
+import sys, json, time, random, argparse, tracemalloc
+from utils.adf import build_tasks_page_doc, tasks_page_doc_json
+
+KEYS = ["ID", "Title", "Desc", "CX", "Role", "Dep", "Client Deps", "Deliverables", "Acceptance"]
+ALPHABET = "abc XYZ 019 \"\\/\n\t\x01<>&é–✅🚀*_`[]()#-"  # markdown marks exercise the Desc cells
+
+
+def random_rows(n: int, rng: random.Random):
+    rows = []
+    for i in range(n):
+        r = {k: "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40))) for k in KEYS if rng.random() < 0.9}
+        r["ID"] = f"F.01.1.A.T{i}"
+        rows.append(r)
+    return rows
+
+
+def measure(fn):
+    """(output, wall seconds untraced, peak traced bytes): tracemalloc slows allocation, so time separately."""
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    del out
+    tracemalloc.start()
+    out = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+    rng = random.Random(7)
+
+    for n in (0, 1, 2, 17, 500):
+        rows = random_rows(n, rng)
+        for budget in ((0, 0), (7, 0), (0, 4096), (50, 20000)):  # (max_rows, max_bytes): expand sections
+            if tasks_page_doc_json("F.01.1.A \"x\" –", rows, *budget) != \
+                    json.dumps(build_tasks_page_doc("F.01.1.A \"x\" –", rows, *budget)):
+                print(f"parity FAILED for {n} rows, budget {budget}")
+                return 1
+    print("parity: ok")
+
+    rows = random_rows(args.rows, rng)
+    best = {}
+    for _ in range(args.runs):
+        for name, fn in (("dict+dumps", lambda: json.dumps(build_tasks_page_doc("F.01.1.A", rows))),
+                         ("streaming", lambda: tasks_page_doc_json("F.01.1.A", rows))):
+            out, elapsed, peak = measure(fn)
+            t, p, _ = best.get(name, (elapsed, peak, 0))
+            best[name] = (min(t, elapsed), min(p, peak), len(out))
+    assert best["dict+dumps"][2] == best["streaming"][2]
+    print(f"rows: {args.rows}  document: {best['streaming'][2] / 2**20:.1f} MiB")
+    for name, (t, peak, _) in best.items():
+        print(f"  {name:<11} {t * 1000:8.1f} ms   peak {peak / 2**20:7.1f} MiB")
+    (td, pd, _), (ts, ps, _) = best["dict+dumps"], best["streaming"]
+    print(f"  streaming is {td / ts:.1f}x faster with {pd / ps:.1f}x less peak memory")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Startup benchmark for the CLI entry points.
+
+    python scripts/bench_startup.py [--runs 15] [--budget-ms 50]
+
+For each entry point, starts fresh interpreters that import it and reports the median wall
+time, the median time spent importing it (from -X importtime: everything after site, so the
+environment's .pth hooks and interpreter start-up noise don't count) and its slowest direct
+imports. Bytecode is brought up to date first. Exits 1 if an entry point takes more than
+--budget-ms to import or pulls in a heavy module (pandas, requests, httpx, sqlite3) at import
+time; those belong behind the feature that needs them.
+"""
+import os, sys, argparse, compileall, statistics, subprocess, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["run", "validate", "scripts.discover_subcomponents", "scripts.discover_f01_subcomponents",
+                "scripts.generate_f01_seed", "scripts.generate_seed_for_range"]
+HEAVY = ["pandas", "numpy", "requests", "httpx", "sqlite3"]
+
+
+def _python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True)
+
+
+def wall_ms(code: str) -> float:
+    t0 = time.perf_counter()
+    _python(code)
+    return (time.perf_counter() - t0) * 1000
+
+
+def import_profile(module: str):
+    """(ms to import module, [(cumulative us, name) of its direct imports]) from -X importtime."""
+    total, direct, after_site = 0, [], False
+    for line in _python(f"import {module}", "-X", "importtime").stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if name.strip() == "site":
+            after_site = True
+        elif after_site and name.strip() == module and not name.startswith("  "):
+            total = int(parts[1])
+        elif after_site and name.startswith("  ") and not name.startswith("    "):  # direct imports of the module
+            direct.append((int(parts[1]), name.strip()))
+    return total / 1000, direct
+
+
+def cost_ms(module: str, runs: int):
+    """
+    (median wall ms, median import ms, slowest direct imports of the median run). The import time
+    is what the interpreter itself attributes to the module, everything after site; unlike the
+    wall-time difference to a bare interpreter it isn't at the mercy of process start-up noise.
+    """
+    walls = [wall_ms(f"import {module}") for _ in range(runs)]
+    profiles = sorted((import_profile(module) for _ in range(runs)), key=lambda p: p[0])
+    ms, direct = profiles[len(profiles) // 2]
+    return statistics.median(walls), ms, sorted(direct, reverse=True)[:3]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure import/startup time of the CLI entry points")
+    ap.add_argument("--runs", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=50)
+    args = ap.parse_args()
+
+    # Measure imports, not compilation: with stale bytecode (e.g. right after an edit, under
+    # PYTHONDONTWRITEBYTECODE) every run would recompile the sources it touches.
+    compileall.compile_dir(ROOT, quiet=1)
+    print(f"bare interpreter: {statistics.median(wall_ms('pass') for _ in range(args.runs)):.1f} ms")
+    failed = False
+    for mod in ENTRY_POINTS:
+        r = _python(f"import sys, {mod}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+        if r.returncode:
+            print(f"{mod:40s} import failed: {r.stderr.strip().splitlines()[-1]}")
+            failed = True
+            continue
+        heavy = r.stdout.strip()
+        ms, extra, direct = cost_ms(mod, args.runs)
+        slow = ", ".join(f"{name} {us / 1000:.1f}ms" for us, name in direct)
+        over = extra > args.budget_ms
+        failed |= over or bool(heavy)
+        print(f"{mod:40s} {ms:6.1f} ms ({extra:5.1f} importing){'  HEAVY: ' + heavy if heavy else ''}"
+              f"{'  OVER BUDGET' if over else ''}\n{'':40s} slowest: {slow}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Tasks page rendering cost per backend, from the shared task table.
+
+    python -m scripts.bench_task_render [--rows 20000] [--runs 3]
+
+Builds a synthetic tasks CSV index for one OptionRef, then times normalizing it into a
+TaskTable (done once per OptionRef per run) and rendering it with the storage and the ADF
+backend, with and without the default chunking budget.
+"""
+import sys, time, argparse
+from run import DEFAULT_TASK_BUDGET
+from utils.task_table import TaskTable, BACKENDS
+
+
+def synthetic_tasks(n: int):
+    ref = "F.01.1.A"
+    return {ref: [{"OptionRef": ref, "Task ID": f"{ref}.T{i}", "Task Title": f"Task {i} – set up the connector",
+                   "Task Description": f"Configure source {i}, private networking & alerting <per runbook>.",
+                   "Complexity": ("Low", "Medium", "High")[i % 3], "Primary Role": "DE", "Notes": "",
+                   "Predecessors": f"{ref}.T{i - 1}" if i else "", "Client Dependencies": "Source access",
+                   "Deliverables": "Pipeline", "Acceptance Criteria": "Data lands within SLA"} for i in range(n)]}
+
+
+def best_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    tasks = synthetic_tasks(args.rows)
+    ref, rows = next(iter(tasks.items()))
+    print(f"rows: {args.rows}")
+    print(f"  normalize (TaskTable) {best_ms(lambda: TaskTable(ref, rows), args.runs):8.1f} ms")
+    table = TaskTable(ref, rows)
+    for name, backend in BACKENDS.items():
+        for label, budget in (("whole", (0, 0)), ("chunked", DEFAULT_TASK_BUDGET)):
+            ms = best_ms(lambda: backend.render(table, budget), args.runs)
+            size = len(backend.render(table, budget).encode("utf-8"))
+            print(f"  {name:<8} {label:<8} {ms:8.1f} ms   {size / 2**20:6.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
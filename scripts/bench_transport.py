@@ -0,0 +1,54 @@
+"""
+Compare the requests (HTTP/1.1) and http2 transports against the local stand-in server.
+
+    python -m scripts.bench_transport --pages 400 --workers 32 --latency-ms 20
+
+Each round seeds the same pages, then runs concurrent title lookups and page creates through
+ConfluenceAPI, and reports wall time, requests/s and how many connections the server accepted.
+"""
+import time, argparse
+from concurrent.futures import ThreadPoolExecutor
+from utils.confluence_api import ConfluenceAPI
+from utils.concurrency import AdaptiveLimiter
+from utils.transport import RequestsTransport, Http2Transport
+from scripts.standin_server import StandinSpace, serve_http1, serve_h2c
+
+
+def run_round(name: str, transport, base_url: str, space: StandinSpace, pages: int, workers: int):
+    api = ConfluenceAPI(base_url, "bench", "bench", space.space_key, transport=transport,
+                        limiter=AdaptiveLimiter(initial=workers, max_limit=workers, target_latency=30))
+    titles = [f"Bench Page {i:05d}" for i in range(pages)]
+    space.connections = space.requests = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        found = sum(1 for p in pool.map(api.find_page_by_title, titles) if p)
+        created = list(pool.map(lambda t: api.create_page(t + " (new)", "<p>bench</p>"), titles))
+    wall = time.perf_counter() - t0
+    transport.close()
+    n = space.requests
+    print(f"{name:9s} wall={wall:6.2f}s requests={n} req/s={n / wall:7.1f} connections={space.connections}"
+          f" found={found} created={len(created)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark HTTP/1.1 vs HTTP/2 transports on a local stand-in server")
+    ap.add_argument('--pages', type=int, default=400)
+    ap.add_argument('--workers', type=int, default=32)
+    ap.add_argument('--latency-ms', type=float, default=20, help='Server-side latency per request')
+    ap.add_argument('--h2-connections', type=int, default=2)
+    args = ap.parse_args()
+
+    rounds = [("requests", lambda: RequestsTransport("bench", "bench", pool_size=args.workers), serve_http1),
+              ("http2", lambda: Http2Transport("bench", "bench", max_connections=args.h2_connections,
+                                               prior_knowledge=True), serve_h2c)]
+    for name, make, serve in rounds:
+        space = StandinSpace("BENCH", latency=args.latency_ms / 1000)
+        for i in range(args.pages):
+            space.add_page(f"Bench Page {i:05d}")
+        srv = serve(space)
+        port = srv if isinstance(srv, int) else srv.server_address[1]
+        run_round(name, make(), f"http://127.0.0.1:{port}", space, args.pages, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Checks that a PageIndex scoped to an ancestor follows subtrees moved into and out of its scope.
+
+    python -m scripts.check_page_index
+
+Builds a small space on the local stand-in server whose pages were last modified long ago, then
+moves a page with two levels of descendants under the indexed ancestor and back out again. Only
+the moved page shows up in the delta, so each refresh must add or drop its descendants itself.
+Prints what each refresh did and exits 1 if the index is wrong after either move.
+"""
+import sys
+from utils.confluence_api import ConfluenceAPI
+from utils.page_index import PageIndex
+from scripts.standin_server import StandinSpace, serve_http1
+
+LONG_AGO = "2020-01-01T00:00:00.000Z"
+
+
+def main():
+    space = StandinSpace("CHECK")
+    root = space.add_page("Scope root")
+    inside = space.add_page("Inside", root)
+    outside = space.add_page("Outside")
+    moved = space.add_page("Moved", outside)
+    subtree = [moved, space.add_page("Moved child", moved)]
+    subtree.append(space.add_page("Moved grandchild", subtree[1]))
+    for pid, p in space.pages.items():
+        if pid != inside: p["when"] = LONG_AGO  # the watermark stays recent, so the delta skips them
+    srv = serve_http1(space)
+    api = ConfluenceAPI(f"http://127.0.0.1:{srv.server_address[1]}", "check", "check", space.space_key)
+
+    idx = PageIndex(space.space_key, ancestor_id=root)
+    idx.refresh(api)
+    failed = sorted(idx.pages) != [inside]
+    for label, parent, want in (("move in", inside, True), ("move out", outside, False)):
+        api.move_page(moved, parent)
+        stats = idx.refresh(api)
+        wrong = [pid for pid in subtree if (pid in idx.pages) != want]
+        print(f"{label:9s} {', '.join(f'{k}={v}' for k, v in stats.items() if v)}"
+              f"{'  WRONG: ' + ', '.join(space.pages[p]['title'] for p in wrong) if wrong else ''}")
+        failed |= bool(wrong)
+    srv.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
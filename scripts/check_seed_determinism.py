@@ -0,0 +1,71 @@
+"""
+Checks that generate_seed_for_range.py writes the same files serially and with --jobs.
+
+    python -m scripts.check_seed_determinism [--discovered subcomponents.json] [--jobs 4]
+                                             [--options-per-subcomponent 3]
+
+Without --discovered, uses a synthetic F.01–F.07 range (200 subcomponents per component, with
+repeated titles so ties in the sort order are exercised). Runs the generator once serially and
+once with --jobs, prints the SHA-256 of each output file from both runs, and exits 1 on any
+difference.
+"""
+import os, sys, json, hashlib, argparse, tempfile, subprocess
+
+FILES = ["Confluence_Page_Creation_Plan.json", "Confluence_Page_Creation_Plan.csv",
+         "Blueprint_Options_With_Refs.csv", "Blueprint_Tasks_Mapped_To_OptionRefs.csv"]
+
+
+def synthetic_range(per_component: int = 200):
+    subs = []
+    for c in range(1, 8):
+        comp = f"F.0{c} – Component {c}"
+        for s in range(1, per_component + 1):
+            title = f"F.0{c}.{s} – Subcomponent {s}" if s % 50 else "Shared title"
+            subs.append({"subcomponent_title": title, "component_title": comp,
+                         "component_pattern": comp, "subcomponent_code": f"F.0{c}.{s}"})
+    return subs
+
+
+def digests(out_dir: str):
+    out = {}
+    for name in FILES:
+        with open(os.path.join(out_dir, name), "rb") as f:
+            out[name] = hashlib.sha256(f.read()).hexdigest()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--discovered", default="")
+    ap.add_argument("--jobs", type=int, default=4)
+    ap.add_argument("--options-per-subcomponent", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        discovered = args.discovered
+        if not discovered:
+            discovered = os.path.join(tmp, "subcomponents.json")
+            with open(discovered, "w", encoding="utf-8") as f:
+                json.dump(synthetic_range(), f, ensure_ascii=False)
+        results = {}
+        for label, jobs in (("serial", 1), (f"jobs={args.jobs}", args.jobs)):
+            out_dir = os.path.join(tmp, label)
+            subprocess.run([sys.executable, "-m", "scripts.generate_seed_for_range", "--discovered", discovered,
+                            "--out-dir", out_dir, "--jobs", str(jobs),
+                            "--options-per-subcomponent", str(args.options_per_subcomponent)],
+                           check=True, stdout=subprocess.DEVNULL)
+            results[label] = digests(out_dir)
+
+    serial, parallel = results.values()
+    for name in FILES:
+        status = "ok" if serial[name] == parallel[name] else "DIFFERS"
+        print(f"{name:<42} {serial[name][:16]}  {parallel[name][:16]}  {status}")
+    if serial != parallel:
+        print("serial and parallel output differ")
+        return 1
+    print(f"identical: serial and --jobs {args.jobs}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
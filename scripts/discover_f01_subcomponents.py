@@ -1,27 +1,8 @@
 import os, json, argparse
 from typing import List, Dict, Any, Optional
-import requests
 from dotenv import load_dotenv
 from utils.confluence_api import ConfluenceAPI
-
-
-def list_child_pages(session: requests.Session, base_url: str, parent_id: str) -> List[Dict[str, Any]]:
-    results: List[Dict[str, Any]] = []
-    start = 0
-    limit = 100
-    while True:
-        url = f"{base_url}/rest/api/content/{parent_id}/child/page?start={start}&limit={limit}"
-        r = session.get(url, timeout=30)
-        r.raise_for_status()
-        data = r.json()
-        values = data.get('results', [])
-        for v in values:
-            results.append(v)
-        if data.get('_links', {}).get('next'):
-            start += limit
-            continue
-        break
-    return results
+from utils.transport import make_transport
 
 
 def main():
@@ -30,17 +11,36 @@ def main():
     ap.add_argument('--parent-id', default='', help='Parent page ID for F.01 – Ingest')
     ap.add_argument('--parent-title', default='', help='Parent page title if ID not known (e.g., F.01 – Ingest)')
     ap.add_argument('--output', default='data/Confluence_Page_Creation_Plan.json', help='Path to write plan JSON')
+    ap.add_argument('--http-cache', default=os.getenv('CONFLUENCE_HTTP_CACHE', ''),
+                   help='SQLite file caching GET responses between runs')
+    ap.add_argument('--cache-ttl', type=float, default=0,
+                   help='Seconds a cached GET is reused without revalidation (0 = always revalidate)')
+    ap.add_argument('--cassette', default='', help='Cassette file of recorded HTTP exchanges (.jsonl or .jsonl.gz)')
+    ap.add_argument('--cassette-mode', choices=['record', 'replay'],
+                   help='Record this run into --cassette (overwriting it), or replay it offline; required with --cassette')
     args = ap.parse_args()
+    if args.cassette and not args.cassette_mode:
+        ap.error('--cassette needs --cassette-mode record or replay')
 
     base_url = (os.getenv('CONFLUENCE_BASE_URL') or '').rstrip('/')
     email = os.getenv('CONFLUENCE_EMAIL') or ''
     token = os.getenv('CONFLUENCE_API_TOKEN') or ''
     space_key = os.getenv('CONFLUENCE_SPACE_KEY', 'LDPB')
 
-    if not base_url or not email or not token:
+    replay = args.cassette and args.cassette_mode == 'replay'
+    if not replay and (not base_url or not email or not token):
         raise SystemExit('Missing CONFLUENCE_BASE_URL, CONFLUENCE_EMAIL, or CONFLUENCE_API_TOKEN in .env')
 
-    api = ConfluenceAPI(base_url=base_url, email=email, api_token=token, space_key=space_key)
+    cache = None
+    if args.http_cache:
+        from utils.http_cache import HttpCache
+        cache = HttpCache(args.http_cache, ttl=args.cache_ttl)
+    transport = make_transport('requests', email, token)
+    if args.cassette:
+        from utils.cassette import open_cassette
+        transport = open_cassette(args.cassette_mode, args.cassette, transport)
+    api = ConfluenceAPI(base_url=base_url, email=email, api_token=token, space_key=space_key, cache=cache,
+                        transport=transport)
 
     parent_title: Optional[str] = None
     parent_id = (args.parent_id or '').strip()
@@ -55,14 +55,12 @@ def main():
         parent_title = parent.get('title') or title
     else:
         # Resolve title for readability
-        p = api.session.get(f"{api.base_url}/rest/api/content/{parent_id}")
         try:
-            p.raise_for_status()
-            parent_title = p.json().get('title')
+            parent_title = (api.find_page_by_id(parent_id) or {}).get('title') or args.parent_title or ''
         except Exception:
             parent_title = args.parent_title or ''
 
-    children = list_child_pages(api.session, api.base_url, parent_id)
+    children = api.list_children(parent_id)
 
     plan_rows: List[Dict[str, Any]] = []
     for child in children:
@@ -86,6 +84,7 @@ def main():
         json.dump(plan_rows, f, indent=2)
 
     print(f"Wrote {len(plan_rows)} Subcomponent rows to {args.output}")
+    api.close()
 
 
 if __name__ == '__main__':
@@ -1,27 +1,8 @@
-import os, json, argparse, requests
+import os, json, argparse
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from utils.confluence_api import ConfluenceAPI
-
-
-def list_child_pages(session: requests.Session, base_url: str, parent_id: str) -> List[Dict[str, Any]]:
-    """List all child pages under a parent page ID."""
-    results: List[Dict[str, Any]] = []
-    start = 0
-    limit = 100
-    while True:
-        url = f"{base_url}/rest/api/content/{parent_id}/child/page?start={start}&limit={limit}"
-        r = session.get(url, timeout=30)
-        r.raise_for_status()
-        data = r.json()
-        values = data.get('results', [])
-        for v in values:
-            results.append(v)
-        if data.get('_links', {}).get('next'):
-            start += limit
-            continue
-        break
-    return results
+from utils.transport import make_transport
 
 
 def find_component_pages(api: ConfluenceAPI, component_patterns: List[str]) -> Dict[str, Dict[str, Any]]:
@@ -59,17 +40,36 @@ def main():
                    help='Output file for discovered subcomponents')
     ap.add_argument('--parent-overrides', default='data/parent_overrides.json',
                    help='JSON file with parent page ID overrides')
+    ap.add_argument('--http-cache', default=os.getenv('CONFLUENCE_HTTP_CACHE', ''),
+                   help='SQLite file caching GET responses between runs')
+    ap.add_argument('--cache-ttl', type=float, default=0,
+                   help='Seconds a cached GET is reused without revalidation (0 = always revalidate)')
+    ap.add_argument('--cassette', default='', help='Cassette file of recorded HTTP exchanges (.jsonl or .jsonl.gz)')
+    ap.add_argument('--cassette-mode', choices=['record', 'replay'],
+                   help='Record this run into --cassette (overwriting it), or replay it offline; required with --cassette')
     args = ap.parse_args()
+    if args.cassette and not args.cassette_mode:
+        ap.error('--cassette needs --cassette-mode record or replay')
 
     base_url = (os.getenv('CONFLUENCE_BASE_URL') or '').rstrip('/')
     email = os.getenv('CONFLUENCE_EMAIL') or ''
     token = os.getenv('CONFLUENCE_API_TOKEN') or ''
     space_key = os.getenv('CONFLUENCE_SPACE_KEY', 'LDPB')
 
-    if not base_url or not email or not token:
+    replay = args.cassette and args.cassette_mode == 'replay'
+    if not replay and (not base_url or not email or not token):
         raise SystemExit('Missing CONFLUENCE_BASE_URL, CONFLUENCE_EMAIL, or CONFLUENCE_API_TOKEN in .env')
 
-    api = ConfluenceAPI(base_url=base_url, email=email, api_token=token, space_key=space_key)
+    cache = None
+    if args.http_cache:
+        from utils.http_cache import HttpCache
+        cache = HttpCache(args.http_cache, ttl=args.cache_ttl)
+    transport = make_transport('requests', email, token)
+    if args.cassette:
+        from utils.cassette import open_cassette
+        transport = open_cassette(args.cassette_mode, args.cassette, transport)
+    api = ConfluenceAPI(base_url=base_url, email=email, api_token=token, space_key=space_key, cache=cache,
+                        transport=transport)
 
     # Load parent overrides if available
     parent_overrides = {}
@@ -103,7 +103,7 @@ def main():
         parent_title = component_page.get('title', pattern)
         
         # Get child pages
-        children = list_child_pages(api.session, api.base_url, parent_id)
+        children = api.list_children(parent_id)
         
         for child in children:
             title = (child.get('title') or '').strip()
@@ -135,6 +135,7 @@ def main():
         count = len([s for s in all_subcomponents if s['component_pattern'] == pattern])
         status = "✓" if pattern in components else "✗"
         print(f"  {status} {pattern}: {count} subcomponents")
+    api.close()
 
 
 if __name__ == '__main__':
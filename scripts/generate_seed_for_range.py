@@ -1,6 +1,17 @@
-import os, json, argparse, csv
-from typing import List, Dict, Any
+import os, json, argparse, heapq, pickle, tempfile, contextlib
+from itertools import groupby, repeat
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import re
+from utils.seed_catalog import DEFAULT_PATH, SeedCatalog, load_catalog, mode_list
+from utils.seed_writer import JsonListWriter, CsvRowWriter, CsvLines, json_item
+
+# Columns of the generated files, in the order the row builders below produce them
+PLAN_FIELDS = ['Page Title', 'Parent Page', 'Page Type', 'Labels', 'Description / Notes', 'Complexity',
+               'Mode Applicability', 'Validation / Cleanup Flag', 'Code / Ref']
+OPTION_FIELDS = ['OptionRef', 'OptionTitle', 'ParentSubcomponent', 'Complexity', 'ModeApplicability',
+                 'ValidationFlag', 'Description']
+TASK_FIELDS = ['OptionRef', 'Task', 'Role', 'Complexity', 'MVP', 'Production', 'Enterprise', 'Description']
+PAGE_TYPES = ['Subcomponent', 'Option', 'Tasks']  # by the page type rank in the sort key
 
 
 def generate_subcomponent_row(subcomp: Dict[str, Any]) -> Dict[str, Any]:
@@ -18,17 +29,19 @@ def generate_subcomponent_row(subcomp: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def generate_option_row(subcomp: Dict[str, Any], option_letter: str, option_name: str) -> Dict[str, Any]:
-    """Generate an Option page row."""
+def generate_option_row(subcomp: Dict[str, Any], option_letter: str, option_name: str,
+                        template: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Generate an Option page row, from the catalog's template for this option when there is one."""
     option_code = f"{subcomp['subcomponent_code']}.{option_letter}"
+    t = template or {}
     return {
-        'Page Title': f"{option_code} – {option_name}",
+        'Page Title': f"{option_code} – {t.get('title') or option_name}",
         'Parent Page': subcomp['subcomponent_title'],
         'Page Type': 'Option',
         'Labels': f"blueprint;option;{subcomp['component_pattern'].split(' ')[0]}",
-        'Description / Notes': f"Implementation option for {subcomp['subcomponent_title']}",
-        'Complexity': 'Medium',  # Default, can be customized
-        'Mode Applicability': 'MVP,Production,Enterprise',
+        'Description / Notes': t.get('notes') or f"Implementation option for {subcomp['subcomponent_title']}",
+        'Complexity': t.get('complexity') or 'Medium',
+        'Mode Applicability': mode_list(t) if t else 'MVP,Production,Enterprise',
         'Validation / Cleanup Flag': 'Pending',
         'Code / Ref': option_code
     }
@@ -49,102 +62,115 @@ def generate_tasks_row(option_code: str, parent_title: str) -> Dict[str, Any]:
     }
 
 
-def generate_options_csv(plan_rows: List[Dict[str, Any]], out_dir: str):
-    """Generate Blueprint_Options_With_Refs.csv from plan rows."""
-    options = [row for row in plan_rows if row.get('Page Type') == 'Option']
-    
-    options_csv = []
-    for option in options:
-        options_csv.append({
-            'OptionRef': option['Code / Ref'],
-            'OptionTitle': option['Page Title'],
-            'ParentSubcomponent': option['Parent Page'],
-            'Complexity': option.get('Complexity', 'Medium'),
-            'ModeApplicability': option.get('Mode Applicability', 'MVP,Production,Enterprise'),
-            'ValidationFlag': option.get('Validation / Cleanup Flag', 'Pending'),
-            'Description': option.get('Description / Notes', '')
-        })
-    
-    options_path = os.path.join(out_dir, 'Blueprint_Options_With_Refs.csv')
-    with open(options_path, 'w', newline='', encoding='utf-8') as f:
-        if options_csv:
-            writer = csv.DictWriter(f, fieldnames=options_csv[0].keys())
-            writer.writeheader()
-            writer.writerows(options_csv)
-    
-    print(f"Generated {len(options_csv)} options -> {options_path}")
+def option_csv_row(option: Dict[str, Any]) -> Dict[str, Any]:
+    """Blueprint_Options_With_Refs.csv row of an Option plan row."""
+    return {
+        'OptionRef': option['Code / Ref'],
+        'OptionTitle': option['Page Title'],
+        'ParentSubcomponent': option['Parent Page'],
+        'Complexity': option['Complexity'],
+        'ModeApplicability': option['Mode Applicability'],
+        'ValidationFlag': option['Validation / Cleanup Flag'],
+        'Description': option['Description / Notes']
+    }
 
 
-def generate_tasks_csv(plan_rows: List[Dict[str, Any]], out_dir: str):
-    """Generate Blueprint_Tasks_Mapped_To_OptionRefs.csv from plan rows."""
-    tasks = [row for row in plan_rows if row.get('Page Type') == 'Tasks']
-    
-    tasks_csv = []
-    for task in tasks:
-        option_ref = task['Code / Ref']
-        # Generate sample tasks for each option
-        sample_tasks = [
-            {
-                'OptionRef': option_ref,
-                'Task': f'Setup {option_ref} infrastructure',
-                'Role': 'DevOps',
-                'Complexity': 'Medium',
-                'MVP': 'Yes',
-                'Production': 'Yes', 
-                'Enterprise': 'Yes',
-                'Description': f'Initial setup and configuration for {option_ref}'
-            },
-            {
-                'OptionRef': option_ref,
-                'Task': f'Implement {option_ref} core functionality',
-                'Role': 'Developer',
-                'Complexity': 'High',
-                'MVP': 'Yes',
-                'Production': 'Yes',
-                'Enterprise': 'Yes', 
-                'Description': f'Core implementation of {option_ref} features'
-            },
-            {
-                'OptionRef': option_ref,
-                'Task': f'Test {option_ref} implementation',
-                'Role': 'QA',
-                'Complexity': 'Medium',
-                'MVP': 'Yes',
-                'Production': 'Yes',
-                'Enterprise': 'Yes',
-                'Description': f'Comprehensive testing of {option_ref}'
-            },
-            {
-                'OptionRef': option_ref,
-                'Task': f'Deploy {option_ref} to production',
-                'Role': 'DevOps',
-                'Complexity': 'High',
-                'MVP': 'No',
-                'Production': 'Yes',
-                'Enterprise': 'Yes',
-                'Description': f'Production deployment of {option_ref}'
-            },
-            {
-                'OptionRef': option_ref,
-                'Task': f'Monitor and optimize {option_ref}',
-                'Role': 'Operations',
-                'Complexity': 'Low',
-                'MVP': 'No',
-                'Production': 'No',
-                'Enterprise': 'Yes',
-                'Description': f'Ongoing monitoring and optimization of {option_ref}'
-            }
-        ]
-        tasks_csv.extend(sample_tasks)
-    
-    tasks_path = os.path.join(out_dir, 'Blueprint_Tasks_Mapped_To_OptionRefs.csv')
-    with open(tasks_path, 'w', newline='', encoding='utf-8') as f:
-        if tasks_csv:
-            writer = csv.DictWriter(f, fieldnames=tasks_csv[0].keys())
-            writer.writeheader()
-            writer.writerows(tasks_csv)
-    
-    print(f"Generated {len(tasks_csv)} tasks -> {tasks_path}")
+def task_csv_rows(option_ref: str, catalog: SeedCatalog) -> List[Dict[str, Any]]:
+    """Blueprint_Tasks_Mapped_To_OptionRefs.csv rows of an option, from the catalog's task templates."""
+    return [{
+        'OptionRef': option_ref,
+        'Task': t['title'],
+        'Role': t['role'],
+        'Complexity': t['complexity'],
+        'MVP': t['mvp'],
+        'Production': t['production'],
+        'Enterprise': t['enterprise'],
+        'Description': t['description']
+    } for t in catalog.tasks_for(option_ref, default=True)]
+
+
+def _options(subcomp: Dict[str, Any], n_options: int, catalog: SeedCatalog) -> List[Tuple[str, int, str, Optional[Dict[str, str]]]]:
+    """(page title, position after the subcomponent row, letter, catalog template) per option, by page title."""
+    templates = {o['letter']: o for o in catalog.options_for(subcomp['subcomponent_code'])}
+    code = subcomp['subcomponent_code']
+    out = []
+    for i in range(n_options):
+        letter = chr(ord('A') + i)
+        t = templates.get(letter)
+        out.append((f"{code}.{letter} – {(t or {}).get('title') or f'Option {letter} Implementation'}", 1 + 2 * i, letter, t))
+    return sorted(out)
+
+
+def keyed_plan(indexed: List[Tuple[int, Dict[str, Any]]], n_options: int,
+               catalog: SeedCatalog) -> Iterator[Tuple[tuple, Any]]:
+    """
+    (sort key, row factory) of the plan rows of the given (input position, subcomponent) pairs,
+    ordered by (Parent Page, page type, Page Title), generated as they are written.
+    Subcomponent, Option and Tasks rows each come out of the input already in that order (the
+    Tasks rows through a merge over the subcomponents) and heapq.merge interleaves the three.
+    Ties go by generation order (subcomponent, then option and tasks row per option), so the
+    result is what a stable sort of the full list gave. Keys are comparable across calls: the
+    streams of disjoint parts of the input merge into the stream of the whole.
+    """
+    per = 1 + 2 * n_options  # rows generated per subcomponent
+
+    def subcomponent_rows():
+        for i, sc in sorted(indexed, key=lambda p: (p[1]['component_title'], p[1]['subcomponent_title'], p[0])):
+            yield (sc['component_title'], 0, sc['subcomponent_title'], i * per), lambda sc=sc: generate_subcomponent_row(sc)
+
+    def option_rows():
+        by_title = sorted(indexed, key=lambda p: (p[1]['subcomponent_title'], p[0]))
+        for title, group in groupby(by_title, key=lambda p: p[1]['subcomponent_title']):
+            for key, sc, letter, t in sorted(((title, 1, page_title, i * per + k), sc, letter, t)
+                                             for i, sc in group for page_title, k, letter, t in _options(sc, n_options, catalog)):
+                yield key, lambda sc=sc, letter=letter, t=t: generate_option_row(
+                    sc, letter, f"Option {letter} Implementation", t)
+
+    def tasks_rows(i, sc):
+        code = sc['subcomponent_code']
+        for page_title, k, letter, _ in _options(sc, n_options, catalog):
+            yield (page_title, 2, f"Tasks – {code}.{letter}", i * per + k + 1), \
+                lambda page_title=page_title, letter=letter: generate_tasks_row(f"{code}.{letter}", page_title)
+
+    tasks = heapq.merge(*(tasks_rows(i, sc) for i, sc in indexed), key=lambda kr: kr[0])
+    return heapq.merge(subcomponent_rows(), option_rows(), tasks, key=lambda kr: kr[0])
+
+
+def plan_records(indexed: List[Tuple[int, Dict[str, Any]]], n_options: int, catalog: SeedCatalog) -> Iterator[tuple]:
+    """
+    (sort key, plan JSON item, plan CSV line, options CSV line or "", tasks CSV lines, number
+    of tasks) per plan row, encoded the way the writers in main() expect.
+    """
+    lines = CsvLines()
+    for key, make_row in keyed_plan(indexed, n_options, catalog):
+        row = make_row()
+        option, tasks, n_tasks = "", "", 0
+        if key[1] == 1:
+            o = option_csv_row(row)
+            option = lines([o[k] for k in OPTION_FIELDS])
+        elif key[1] == 2:
+            rows = task_csv_rows(row['Code / Ref'], catalog)
+            tasks, n_tasks = lines(*([t[k] for k in TASK_FIELDS] for t in rows)), len(rows)
+        yield key, json_item(row, ensure_ascii=False), lines([row[k] for k in PLAN_FIELDS]), option, tasks, n_tasks
+
+
+def write_run(path: str, indexed: List[Tuple[int, Dict[str, Any]]], n_options: int, catalog: SeedCatalog) -> int:
+    """Worker: encode the records of one component into a run file (pickled, in key order)."""
+    n = 0
+    with open(path, 'wb') as f:
+        for record in plan_records(indexed, n_options, catalog):
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            n += 1
+    return n
+
+
+def read_run(path: str) -> Iterator[tuple]:
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
 
 
 def main():
@@ -155,7 +181,12 @@ def main():
                    help='Output directory for generated files')
     ap.add_argument('--options-per-subcomponent', type=int, default=3,
                    help='Number of options to generate per subcomponent')
+    ap.add_argument('--catalog', default=DEFAULT_PATH,
+                   help='Option/task templates (JSON); options without one get generic rows')
+    ap.add_argument('--jobs', type=int, default=1,
+                   help='Generate each component in a pool of N processes (same output as serial)')
     args = ap.parse_args()
+    catalog = load_catalog(args.catalog)
 
     # Load discovered subcomponents
     with open(args.discovered) as f:
@@ -167,61 +198,51 @@ def main():
     
     print(f"Processing {len(subcomponents)} discovered subcomponents...")
     
-    # Generate plan rows
-    plan_rows = []
-    
-    for subcomp in subcomponents:
-        # Add subcomponent row
-        plan_rows.append(generate_subcomponent_row(subcomp))
-        
-        # Generate options for this subcomponent
-        for i in range(args.options_per_subcomponent):
-            option_letter = chr(ord('A') + i)
-            option_name = f"Option {option_letter} Implementation"
-            
-            option_row = generate_option_row(subcomp, option_letter, option_name)
-            plan_rows.append(option_row)
-            
-            # Add corresponding tasks row
-            tasks_row = generate_tasks_row(option_row['Code / Ref'], option_row['Page Title'])
-            plan_rows.append(tasks_row)
-    
-    # Sort by component and page type
-    order_map = {'Subcomponent': 0, 'Option': 1, 'Tasks': 2}
-    plan_rows.sort(key=lambda r: (
-        r['Parent Page'], 
-        order_map.get(r.get('Page Type'), 99),
-        r['Page Title']
-    ))
-    
-    # Write plan JSON
-    plan_path = os.path.join(args.out_dir, 'Confluence_Page_Creation_Plan.json')
+    # Generate the plan in order and write all four files in one pass
     os.makedirs(args.out_dir, exist_ok=True)
-    with open(plan_path, 'w', encoding='utf-8') as f:
-        json.dump(plan_rows, f, indent=2, ensure_ascii=False)
-    
-    print(f"Generated {len(plan_rows)} plan rows -> {plan_path}")
-    
-    # Write plan CSV
+    plan_path = os.path.join(args.out_dir, 'Confluence_Page_Creation_Plan.json')
     plan_csv_path = os.path.join(args.out_dir, 'Confluence_Page_Creation_Plan.csv')
-    with open(plan_csv_path, 'w', newline='', encoding='utf-8') as f:
-        if plan_rows:
-            writer = csv.DictWriter(f, fieldnames=plan_rows[0].keys())
-            writer.writeheader()
-            writer.writerows(plan_rows)
-    
+    options_path = os.path.join(args.out_dir, 'Blueprint_Options_With_Refs.csv')
+    tasks_path = os.path.join(args.out_dir, 'Blueprint_Tasks_Mapped_To_OptionRefs.csv')
+    indexed = list(enumerate(subcomponents))
+    components = {}
+    for i, sc in indexed:
+        components.setdefault(sc['component_title'], []).append((i, sc))
+    counts = {}
+    with contextlib.ExitStack() as stack:
+        fj = stack.enter_context(open(plan_path, 'w', encoding='utf-8'))
+        fp, fo, ft = (stack.enter_context(open(p, 'w', newline='', encoding='utf-8'))
+                      for p in (plan_csv_path, options_path, tasks_path))
+        if args.jobs > 1 and len(components) > 1:
+            # One sorted run file per component, merged by key: the serial order, byte for byte
+            from concurrent.futures import ProcessPoolExecutor
+            runs = stack.enter_context(tempfile.TemporaryDirectory(prefix='.seed-runs-', dir=args.out_dir))
+            paths = [os.path.join(runs, f"{k}.pkl") for k in range(len(components))]
+            with ProcessPoolExecutor(max_workers=min(args.jobs, len(components))) as pool:
+                list(pool.map(write_run, paths, components.values(), repeat(args.options_per_subcomponent), repeat(catalog)))
+            records = heapq.merge(*(read_run(p) for p in paths), key=lambda r: r[0])
+        else:
+            records = plan_records(indexed, args.options_per_subcomponent, catalog)
+
+        plan_json, plan_csv = JsonListWriter(fj, ensure_ascii=False), CsvRowWriter(fp)
+        options_csv, tasks_csv = CsvRowWriter(fo), CsvRowWriter(ft)
+        for key, item, plan_line, option_line, task_lines, n_tasks in records:
+            plan_json.write_encoded(item)
+            plan_csv.write_lines(plan_line, PLAN_FIELDS)
+            if option_line:
+                options_csv.write_lines(option_line, OPTION_FIELDS)
+            if n_tasks:
+                tasks_csv.write_lines(task_lines, TASK_FIELDS, n_tasks)
+            counts[PAGE_TYPES[key[1]]] = counts.get(PAGE_TYPES[key[1]], 0) + 1
+        for w in (plan_json, plan_csv, options_csv, tasks_csv):
+            w.close()
+    
+    print(f"Generated {plan_json.count} plan rows -> {plan_path}")
     print(f"Generated plan CSV -> {plan_csv_path}")
-    
-    # Generate supporting CSV files
-    generate_options_csv(plan_rows, args.out_dir)
-    generate_tasks_csv(plan_rows, args.out_dir)
+    print(f"Generated {options_csv.count} options -> {options_path}")
+    print(f"Generated {tasks_csv.count} tasks -> {tasks_path}")
     
     # Print summary
-    counts = {}
-    for row in plan_rows:
-        page_type = row.get('Page Type', 'Unknown')
-        counts[page_type] = counts.get(page_type, 0) + 1
-    
     print("\nSummary:")
     for page_type, count in counts.items():
         print(f"  {page_type}: {count}")
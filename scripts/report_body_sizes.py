@@ -0,0 +1,45 @@
+"""
+Body size report: default vs --compact storage rendering, per page type.
+
+    python -m scripts.report_body_sizes [--plan data/Confluence_Page_Creation_Plan.json]
+                                        [--tasks data/Blueprint_Tasks_Mapped_To_OptionRefs.csv | --no-tasks]
+
+Renders every plan row both ways, exactly as run.py would send it (storage format, default
+task table budget), and prints the UTF-8 bytes per page type and what compact mode saves (it only changes
+Option pages).
+"""
+import sys, json, argparse
+from collections import defaultdict
+from run import build_body, DEFAULT_TASK_BUDGET
+from utils.plan_row import plan_rows
+from utils.tasks import load_task_index
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--plan", default="data/Confluence_Page_Creation_Plan.json")
+    ap.add_argument("--tasks", default="data/Blueprint_Tasks_Mapped_To_OptionRefs.csv")
+    ap.add_argument("--no-tasks", action="store_true", help="Render Tasks pages without the tasks table (placeholder)")
+    args = ap.parse_args()
+
+    with open(args.plan, encoding="utf-8") as f:
+        rows = plan_rows(json.load(f))
+    tasks = {} if args.no_tasks else load_task_index(args.tasks)
+
+    sizes = defaultdict(lambda: [0, 0, 0])  # page type -> [pages, default bytes, compact bytes]
+    for row in rows:
+        s = sizes[str(row.page_type)]
+        s[0] += 1
+        s[1] += len(build_body(row, tasks, budget=DEFAULT_TASK_BUDGET).encode("utf-8"))
+        s[2] += len(build_body(row, tasks, budget=DEFAULT_TASK_BUDGET, compact=True).encode("utf-8"))
+    sizes["Total"] = [sum(v[i] for v in sizes.values()) for i in range(3)]
+
+    print(f"{'page type':<14}{'pages':>7}{'default B/page':>16}{'compact B/page':>16}{'saved':>8}")
+    for page_type, (n, default, compact) in sizes.items():
+        saved = 1 - compact / default if default else 0
+        print(f"{page_type:<14}{n:>7}{default / max(n, 1):>16.0f}{compact / max(n, 1):>16.0f}{saved:>8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
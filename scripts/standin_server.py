@@ -0,0 +1,290 @@
+"""
+Local stand-in for the Confluence Cloud REST v1 endpoints ConfluenceAPI uses, for benchmarks and
+offline dry runs. Serves HTTP/1.1 and, when the `h2` package is installed, h2c (HTTP/2 with prior
+knowledge) on a second port. Pages live in memory; --seed pre-creates the pages of a plan JSON.
+
+    python scripts/standin_server.py --port 8089 --h2-port 8090 --seed data/Confluence_Page_Creation_Plan.json
+    CONFLUENCE_BASE_URL=http://127.0.0.1:8089 python run.py --dry_run
+"""
+import os, json, re, time, argparse, asyncio, threading, itertools, hashlib, urllib.parse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple, List
+
+
+H2_WORKERS = 64  # threads answering h2c requests
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class StandinSpace:
+    """In-memory pages plus the request router shared by the HTTP/1.1 and HTTP/2 front ends."""
+
+    def __init__(self, space_key: str = "LDPB", latency: float = 0.0):
+        self.space_key = space_key
+        self.latency = latency
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.by_title: Dict[str, str] = {}
+        self.connections = 0
+        self.requests = 0
+        self._ids = itertools.count(100000)
+        self._lock = threading.Lock()
+
+    def add_page(self, title: str, parent_id: Optional[str] = None, body: str = "") -> str:
+        with self._lock:
+            pid = str(next(self._ids))
+            self.pages[pid] = {"id": pid, "title": title, "parent": parent_id, "version": 1,
+                               "when": _now(), "status": "current", "body": body}
+            self.by_title[title] = pid
+            return pid
+
+    def seed_plan(self, rows: List[Dict[str, Any]], root_title: str = "LEIT Data Platform Blueprint"):
+        root = self.by_title.get(root_title) or self.add_page(root_title)
+        for r in rows:
+            title = (r.get("Page Title") or "").strip()
+            if not title or title in self.by_title: continue
+            parent = (r.get("Parent Page") or "").strip()
+            pid = self.by_title.get(parent) or (self.add_page(parent, root) if parent else root)
+            self.add_page(title, pid)
+
+    def _ancestors(self, p):
+        out, cur = [], p.get("parent")
+        while cur and cur in self.pages:
+            out.insert(0, {"id": cur, "type": "page", "title": self.pages[cur]["title"]})
+            cur = self.pages[cur].get("parent")
+        return out
+
+    def _view(self, p):
+        return {"id": p["id"], "type": "page", "status": p["status"], "title": p["title"],
+                "space": {"key": self.space_key}, "ancestors": self._ancestors(p),
+                "version": {"number": p["version"], "when": p["when"]}}
+
+    @staticmethod
+    def _page_of(items, q):
+        start, limit = int(q.get("start", 0)), int(q.get("limit", 25))
+        chunk = items[start:start + limit]
+        return {"results": chunk, "start": start, "limit": limit, "size": len(chunk),
+                "_links": {"next": "more"} if start + limit < len(items) else {}}
+
+    def handle(self, method: str, raw_path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.requests += 1
+        if self.latency: time.sleep(self.latency)
+        u = urllib.parse.urlparse(raw_path)
+        q = dict(urllib.parse.parse_qsl(u.query))
+        path = u.path
+        data = json.loads(body) if body else None
+        with self._lock:
+            if method == "GET":
+                return self._get(path, q)
+            if method == "POST" and path == "/rest/api/content":
+                parent = ((data.get("ancestors") or [{}])[0]).get("id")
+                pid = str(next(self._ids))
+                self.pages[pid] = {"id": pid, "title": data["title"], "parent": parent, "version": 1,
+                                   "when": _now(), "status": "current", "body": data.get("body")}
+                self.by_title[data["title"]] = pid
+                return 200, self._view(self.pages[pid])
+            m = re.fullmatch(r"/rest/api/content/(\d+)/label", path)
+            if method == "POST" and m:
+                return 200, {"results": data, "size": len(data or [])}
+            m = re.fullmatch(r"/rest/api/content/(\d+)/move/append/(\d+)", path)
+            if method == "PUT" and m and m.group(1) in self.pages:
+                self.pages[m.group(1)].update(parent=m.group(2), when=_now())
+                return 200, {"pageId": m.group(1)}
+            m = re.fullmatch(r"/rest/api/content/(\d+)", path)
+            if method == "DELETE" and m and m.group(1) in self.pages:
+                p = self.pages[m.group(1)]  # moves the page to the trash
+                p.update(status="trashed", when=_now())
+                self.by_title.pop(p["title"], None)
+                return 200, {}
+            if method == "PUT" and m and m.group(1) in self.pages:
+                p = self.pages[m.group(1)]
+                if (data.get("version") or {}).get("number") != p["version"] + 1:
+                    return 409, {"message": "Version must be incremented on update."}
+                if p["title"] != data["title"]:
+                    self.by_title.pop(p["title"], None)
+                    self.by_title[data["title"]] = p["id"]
+                p.update(title=data["title"], version=p["version"] + 1, when=_now(), body=data.get("body"))
+                return 200, self._view(p)
+        return 404, {"message": "Not found"}
+
+    def _get(self, path, q):
+        current = [p for p in self.pages.values() if p["status"] == "current"]
+        m = re.fullmatch(r"/rest/api/content/(\d+)", path)
+        if m:
+            p = self.pages.get(m.group(1))
+            return (200, self._view(p)) if p and p["status"] == "current" else (404, {"message": "Not found"})
+        m = re.fullmatch(r"/rest/api/content/(\d+)/child/page", path)
+        if m:
+            return 200, self._page_of([self._view(p) for p in current if p["parent"] == m.group(1)], q)
+        if path == "/rest/api/content":
+            if q.get("status") == "trashed":
+                items = [p for p in self.pages.values() if p["status"] == "trashed"]
+            elif "title" in q:
+                pid = self.by_title.get(q["title"])
+                items = [self.pages[pid]] if pid and self.pages[pid]["status"] == "current" else []
+            else:
+                items = current
+            return 200, self._page_of([self._view(p) for p in items], q)
+        if path == "/rest/api/content/search":
+            cql = q.get("cql", "")
+            m = re.search(r'status in \(([^)]*)\)', cql)
+            statuses = set(re.findall(r'\w+', m.group(1))) if m else {"current"}
+            items = [p for p in self.pages.values() if p["status"] in statuses]
+            m = re.search(r'title ~ "([^"]*)"', cql)
+            if m: items = [p for p in items if m.group(1).lower() in p["title"].lower()]
+            m = re.search(r'ancestor ?(?:= ?"?(\d+)|in \(([\d, ]+)\))', cql)
+            if m:
+                ids = set(re.findall(r"\d+", m.group(1) or m.group(2)))
+                items = [p for p in items if any(a["id"] in ids for a in self._ancestors(p))]
+            m = re.search(r'lastmodified >= "([^"]*)"', cql)
+            if m: items = [p for p in items if p["when"][:16] >= m.group(1).replace(" ", "T")]
+            return 200, self._page_of([self._view(p) for p in items], q)
+        return 404, {"message": "Not found"}
+
+    def respond(self, method: str, path: str, body: bytes, if_none_match: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        status, obj = self.handle(method, path, body)
+        data = json.dumps(obj).encode()
+        headers = {"content-type": "application/json"}
+        if method == "GET" and status == 200:
+            headers["etag"] = '"' + hashlib.md5(data).hexdigest() + '"'
+            if if_none_match == headers["etag"]:
+                return 304, headers, b""
+        return status, headers, data
+
+
+def serve_http1(space: StandinSpace, port: int = 0) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            space.connections += 1
+            super().setup()
+
+        def log_message(self, *a):
+            pass
+
+        def _do(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            status, headers, data = space.respond(self.command, self.path, self.rfile.read(n) if n else b"",
+                                                  self.headers.get("If-None-Match", ""))
+            self.send_response(status)
+            for k, v in headers.items(): self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _do
+
+    srv = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def serve_h2c(space: StandinSpace, port: int = 0) -> int:
+    """Start an h2c (prior-knowledge HTTP/2) listener on a background event loop; returns its port."""
+    import h2.config, h2.connection, h2.events, h2.exceptions
+
+    class Protocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            space.connections += 1
+            self.transport = transport
+            self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+            self.conn.initiate_connection()
+            self.streams: Dict[int, Any] = {}  # stream id -> (headers, body) while the request arrives
+            self.blocked: Dict[int, asyncio.Event] = {}  # stream id -> set when it may send again
+            transport.write(self.conn.data_to_send())
+
+        def _flush(self):
+            if not self.transport.is_closing():
+                self.transport.write(self.conn.data_to_send())
+
+        def data_received(self, data):
+            try:
+                events = self.conn.receive_data(data)
+            except h2.exceptions.ProtocolError:
+                self._flush()  # the GOAWAY h2 queued
+                self.transport.close()
+                return
+            for ev in events:
+                if isinstance(ev, h2.events.RequestReceived):
+                    self.streams[ev.stream_id] = (dict(ev.headers), bytearray())
+                elif isinstance(ev, h2.events.DataReceived):
+                    if ev.stream_id in self.streams:
+                        self.streams[ev.stream_id][1].extend(ev.data)
+                    self.conn.acknowledge_received_data(ev.flow_controlled_length, ev.stream_id)
+                elif isinstance(ev, h2.events.StreamEnded):
+                    if ev.stream_id in self.streams:
+                        asyncio.ensure_future(self.answer(ev.stream_id, *self.streams.pop(ev.stream_id)))
+                elif isinstance(ev, h2.events.StreamReset):
+                    self.streams.pop(ev.stream_id, None)
+                    self._wake(ev.stream_id)  # its answer finds the stream closed and gives up
+                elif isinstance(ev, h2.events.WindowUpdated):
+                    self._wake(ev.stream_id)  # stream 0 is the connection window: every stream may go on
+            self._flush()
+
+        def _wake(self, sid):
+            for s in (list(self.blocked) if sid == 0 else [sid]):
+                ev = self.blocked.pop(s, None)
+                if ev: ev.set()
+
+        def connection_lost(self, exc):
+            self.streams.clear()
+            self._wake(0)
+
+        async def answer(self, sid, headers, body):
+            status, out_headers, data = await asyncio.get_running_loop().run_in_executor(
+                None, space.respond, headers[":method"], headers[":path"], bytes(body), headers.get("if-none-match", ""))
+            try:
+                self.conn.send_headers(sid, [(":status", str(status)), ("content-length", str(len(data)))] +
+                                       list(out_headers.items()), end_stream=not data)
+                while data and not self.transport.is_closing():
+                    window = min(self.conn.local_flow_control_window(sid), self.conn.max_outbound_frame_size)
+                    if window <= 0:
+                        self._flush()
+                        await self.blocked.setdefault(sid, asyncio.Event()).wait()
+                        continue
+                    chunk, data = data[:window], data[window:]
+                    self.conn.send_data(sid, chunk, end_stream=not data)
+            except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError):
+                pass  # reset by the client, or the connection went away while we waited
+            self.blocked.pop(sid, None)
+            self._flush()
+
+    loop = asyncio.new_event_loop()
+    # Requests are answered on threads, like the HTTP/1.1 server's thread per connection; the
+    # default executor (cpu count + 4 threads) would cap concurrency far below the client's.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=H2_WORKERS, thread_name_prefix="h2c"))
+    server = loop.run_until_complete(loop.create_server(Protocol, "127.0.0.1", port))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local stand-in Confluence REST server (HTTP/1.1 + optional h2c)")
+    ap.add_argument('--port', type=int, default=8089)
+    ap.add_argument('--h2-port', type=int, default=0, help='Also serve h2c on this port (needs the h2 package)')
+    ap.add_argument('--space', default=os.getenv('CONFLUENCE_SPACE_KEY', 'LDPB'))
+    ap.add_argument('--seed', default='', help='Plan JSON whose pages should already exist')
+    ap.add_argument('--latency-ms', type=float, default=0, help='Artificial server latency per request')
+    args = ap.parse_args()
+
+    space = StandinSpace(args.space, latency=args.latency_ms / 1000)
+    if args.seed:
+        with open(args.seed) as f:
+            space.seed_plan(json.load(f))
+    serve_http1(space, args.port)
+    print(f"HTTP/1.1 on http://127.0.0.1:{args.port} ({len(space.pages)} pages)")
+    if args.h2_port:
+        print(f"h2c on http://127.0.0.1:{serve_h2c(space, args.h2_port)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,7 @@
+from json import dumps as _dumps
+from json.encoder import encode_basestring_ascii as _str
+from utils.tasks import chunk_ranges
+
 def adf_text(s: str): 
     return {"type":"text","text": s}
 
@@ -15,6 +19,14 @@ def adf_th(text: str, width_px: int):
 def adf_td(text: str):
     return {"type":"tableCell","attrs":{"colspan":1,"rowspan":1},"content":[adf_p(text)]}
 
+def adf_desc_td(text: str):
+    """Description cell: markdown converted to ADF blocks (utils/markdown.py); HTML and empty text stay as they are."""
+    if not text or text.lstrip().startswith("<"):
+        return adf_td(text)
+    from utils.markdown import to_adf  # loaded with the first description, not at startup
+    blocks = to_adf(text)
+    return {"type":"tableCell","attrs":{"colspan":1,"rowspan":1},"content":blocks} if blocks else adf_td(text)
+
 def build_tasks_table_adf(rows: list[dict]) -> dict:
     # Tune these numbers as you like — they are pixel hints
     # Confluence Cloud resizes columns based on header cell colwidth
@@ -34,26 +46,95 @@ def build_tasks_table_adf(rows: list[dict]) -> dict:
         table["content"].append({
             "type":"tableRow",
             "content":[
-                adf_td(r.get("ID","")), adf_td(r.get("Title","")), adf_td(r.get("Desc","")),
+                adf_td(r.get("ID","")), adf_td(r.get("Title","")), adf_desc_td(r.get("Desc","")),
                 adf_td(r.get("CX","")), adf_td(r.get("Role","")), adf_td(r.get("Dep","")),
                 adf_td(r.get("Client Deps","")), adf_td(r.get("Deliverables","")), adf_td(r.get("Acceptance","")),
             ]
         })
     return table
 
-def build_tasks_page_doc(option_ref: str, rows: list[dict]) -> dict:
+def adf_expand(title: str, content: list):
+    return {"type":"expand","attrs":{"title": title},"content": content}
+
+def chunk_title(start: int, end: int, total: int) -> str:
+    return f"Tasks {start + 1}–{end} of {total}"
+
+def task_chunks(rows: list[dict], max_rows: int = 0, max_bytes: int = 0) -> list[tuple[int, int]]:
+    """(start, end) ranges of rows whose tables stay within the budget; byte sizes are the rows' ADF JSON."""
+    sizes = [len(row_json(r)) for r in rows] if max_bytes else [0] * len(rows)
+    return chunk_ranges(sizes, max_rows, max_bytes)
+
+def build_tasks_page_doc(option_ref: str, rows: list[dict], max_rows: int = 0, max_bytes: int = 0) -> dict:
     """
     Build ADF document for tasks page.
+    Over the max_rows / max_bytes budget (0 = none), each chunk of rows gets its own table in an expand section.
     
     Note: After publishing, flip the page to Full width once in Confluence UI 
     (page toolbar → Page width). That affects the canvas, while layout:"wide" 
     affects the table element itself.
     """
+    ranges = task_chunks(rows, max_rows, max_bytes) if (max_rows or max_bytes) else [(0, len(rows))]
+    if len(ranges) == 1:
+        tables = [build_tasks_table_adf(rows)]
+    else:
+        tables = [adf_expand(chunk_title(a, b, len(rows)), [build_tasks_table_adf(rows[a:b])]) for a, b in ranges]
     return {
         "version": 1,
         "type": "doc",
         "content": [
             {"type":"paragraph","content":[adf_text(f"Legend: CX=L/M/H; Role=DE/SDE/SDA/PDA; Dep=Task IDs")]},
-            build_tasks_table_adf(rows)
+            *tables
         ]
     }
+
+# --- Streaming serializer -------------------------------------------------------------------
+# Emits the same text as json.dumps(build_tasks_page_doc(...)) without building the dict tree:
+# the header row and the wrappers around each cell's text are serialized once, and each cell
+# only adds its escaped text (the Desc cell, whose markdown becomes blocks, is dumped whole). Keep in sync with the builders above (scripts/bench_adf_stream.py
+# checks byte parity).
+_TASK_KEYS = ("ID", "Title", "Desc", "CX", "Role", "Dep", "Client Deps", "Deliverables", "Acceptance")
+_EMPTY_TABLE = build_tasks_table_adf([])
+_HEADER_ROW = _dumps(_EMPTY_TABLE["content"][0])
+_TABLE_HEAD, _TABLE_TAIL = _dumps(_EMPTY_TABLE).split(_HEADER_ROW)  # ...[ | ]...
+_ROW_HEAD, _ROW_TAIL = _dumps({"type":"tableRow","content":[]}).split("[]")
+_CELL_HEAD, _CELL_TAIL = _dumps(adf_td("\0")).split(_str("\0"))
+_CELL_SEP = _CELL_TAIL + ", " + _CELL_HEAD
+_EXPAND_HEAD, _rest = _dumps(adf_expand("\0", ["\1"])).split(_str("\0"))
+_EXPAND_MID, _EXPAND_TAIL = _rest.split(_str("\1"))
+
+
+class AdfJson(str):
+    """An ADF document already serialized to JSON; update_page_adf sends it as-is."""
+
+
+def row_json(r: dict) -> str:
+    head = _CELL_SEP.join([_str(r.get(k, "")) for k in _TASK_KEYS[:2]])
+    tail = _CELL_SEP.join([_str(r.get(k, "")) for k in _TASK_KEYS[3:]])
+    desc = _dumps(adf_desc_td(r.get("Desc", "")))  # the one cell with nested blocks
+    return f"{_ROW_HEAD}[{_CELL_HEAD}{head}{_CELL_TAIL}, {desc}, {_CELL_HEAD}{tail}{_CELL_TAIL}]{_ROW_TAIL}"
+
+
+def _table_parts(parts: list[str], rows_json: list[str]):
+    parts += (_TABLE_HEAD, _HEADER_ROW)
+    for r in rows_json:
+        parts += (", ", r)
+    parts.append(_TABLE_TAIL)
+
+
+def tasks_page_doc_json(option_ref: str, rows: list[dict], max_rows: int = 0, max_bytes: int = 0) -> AdfJson:
+    """json.dumps(build_tasks_page_doc(option_ref, rows, max_rows, max_bytes)), streamed from the rows."""
+    rows_json = [row_json(r) for r in rows]
+    ranges = chunk_ranges([len(r) for r in rows_json], max_rows, max_bytes)
+    head, tail = _dumps(build_tasks_page_doc(option_ref, [])).split(_dumps(_EMPTY_TABLE))
+    parts = [head]  # one join at the end: the rows' text is copied once
+    if len(ranges) == 1:
+        _table_parts(parts, rows_json)
+    else:
+        for i, (a, b) in enumerate(ranges):
+            parts += (", " if i else "", _EXPAND_HEAD, _str(chunk_title(a, b, len(rows))), _EXPAND_MID)
+            _table_parts(parts, rows_json[a:b])
+            parts.append(_EXPAND_TAIL)
+    parts.append(tail)
+    text = "".join(parts)
+    del parts, rows_json  # before AdfJson() copies the text
+    return AdfJson(text)
@@ -0,0 +1,136 @@
+import gzip, json, time, base64, hashlib, threading, urllib.parse
+import requests
+from collections import defaultdict, deque
+from typing import Dict, Any, List
+from utils.http_cache import StoredResponse
+
+# A cassette is JSONL (gzipped when the path ends in .gz): one header line, then one line per
+# request/response in completion order. Hosts and credentials are never written, so a cassette
+# recorded against production replays against any base URL.
+
+KEEP_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t", encoding="utf-8") if path.endswith(".gz") else open(path, mode, encoding="utf-8")
+
+
+def _path_of(url: str) -> str:
+    u = urllib.parse.urlsplit(url)
+    return u.path + ("?" + u.query if u.query else "")
+
+
+def _body_key(body: Any) -> str:
+    if body is None: return ""
+    return hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class CassetteMiss(requests.RequestException):
+    """Replay saw a request the cassette has no (remaining) recording for."""
+
+
+class RecordingTransport:
+    """Wraps a real transport and appends every exchange to a cassette."""
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._seq = 0
+        self._f = _open(path, "w")
+        self._f.write(json.dumps({"cassette": 1, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}) + "\n")
+
+    def request(self, method: str, url: str, json: Any = None, **kw):
+        start = time.monotonic()
+        resp = self.inner.request(method, url, json=json, **kw)
+        end = time.monotonic()
+        content = resp.content or b""
+        try:
+            body = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"b64": base64.b64encode(content).decode()}
+        with self._lock:
+            self._seq += 1
+            rec = {"seq": self._seq, "at": round(start - self._t0, 4), "elapsed": round(end - start, 4),
+                   "method": method, "path": _path_of(url), "body": _body_key(json), "status": resp.status_code,
+                   "headers": {k: v for k, v in resp.headers.items() if k.lower() in KEEP_HEADERS}, **body}
+            self._f.write(_dumps(rec) + "\n")
+            self._f.flush()  # a run that dies still leaves a replayable prefix
+        return resp
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+        self.inner.close()
+
+
+class ReplayTransport:
+    """
+    Serves responses from a cassette without touching the network. Requests are matched on
+    method, path+query and JSON body; repeats of the same request are answered in recorded order,
+    so concurrent runs replay even when threads interleave differently. timing="preserve" sleeps
+    each response's recorded latency, "collapse" answers immediately.
+    """
+
+    def __init__(self, path: str, timing: str = "collapse"):
+        if timing not in ("collapse", "preserve"):
+            raise ValueError(f"timing must be collapse or preserve, not {timing!r}")
+        self.path = path
+        self.timing = timing
+        self._lock = threading.Lock()
+        self._queues: Dict[tuple, deque] = defaultdict(deque)
+        self.recorded: List[tuple] = []
+        self.replayed: List[tuple] = []
+        with _open(path, "r") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("cassette") != 1:
+                raise ValueError(f"{path} is not a cassette")
+            for line in f:
+                if not line.strip(): continue
+                rec = json.loads(line)
+                key = (rec["method"], rec["path"], rec["body"])
+                self._queues[key].append(rec)
+                self.recorded.append(key)
+
+    def request(self, method: str, url: str, json: Any = None, **kw):
+        key = (method, _path_of(url), _body_key(json))
+        with self._lock:
+            q = self._queues.get(key)
+            if not q:
+                raise CassetteMiss(f"No recorded response for {method} {key[1]}")
+            rec = q.popleft()
+            self.replayed.append(key)
+        if self.timing == "preserve":
+            time.sleep(rec["elapsed"])
+        content = rec["text"].encode("utf-8") if "text" in rec else base64.b64decode(rec["b64"])
+        return StoredResponse(rec["status"], rec["headers"], content, url)
+
+    def unused(self) -> int:
+        """Recorded exchanges the replayed run never asked for."""
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    def report(self) -> Dict[str, Any]:
+        """Compare the replayed request sequence with the recorded one (ordering and multiset)."""
+        with self._lock:
+            same_set = sorted(self.recorded) == sorted(self.replayed)
+            return {"recorded": len(self.recorded), "replayed": len(self.replayed),
+                    "unused": sum(len(q) for q in self._queues.values()),
+                    "same_requests": same_set, "same_order": same_set and self.recorded == self.replayed}
+
+    def close(self):
+        pass
+
+
+def open_cassette(mode: str, path: str, transport: Any, timing: str = "collapse"):
+    """Wrap transport for mode 'record', replace it for 'replay'; any other mode returns it unchanged."""
+    if mode == "record":
+        return RecordingTransport(transport, path)
+    if mode == "replay":
+        return ReplayTransport(path, timing)
+    return transport
@@ -0,0 +1,127 @@
+import threading, time
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, Hashable
+
+THROTTLED = (429, 503)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD cap on in-flight requests, shared by every worker using one ConfluenceAPI.
+
+    While responses come back healthy (below target_latency) the limit grows by one per
+    window of `limit` successes; a 429/503 or a latency spike halves it, at most once per
+    window so a burst of responses from the same overload counts as one signal. After
+    breaker_threshold consecutive throttles/errors the circuit opens and every acquire()
+    waits out the cooldown (or the server's Retry-After) before traffic resumes at min_limit.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 target_latency: float = 2.0, breaker_threshold: int = 5, breaker_cooldown: float = 30.0):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.target_latency = target_latency
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._last_cut = 0.0
+        self._failures = 0
+        self._latency = 0.0  # EWMA of healthy latencies
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "spikes": 0, "decreases": 0,
+                      "breaker_trips": 0, "wait_s": 0.0, "peak_in_flight": 0,
+                      "limit_min": int(self.limit), "limit_max": int(self.limit)}
+
+    def acquire(self):
+        t0 = time.monotonic()
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+            self.stats["wait_s"] += time.monotonic() - t0
+
+    def release(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """Report one finished request. status None means the request raised (connection error, timeout)."""
+        with self._cond:
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if status in THROTTLED or status is None or status >= 500:
+                self.stats["throttled" if status in THROTTLED else "errors"] += 1
+                self._failures += 1
+                self._decrease(now)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                if self._failures >= self.breaker_threshold:
+                    self.stats["breaker_trips"] += 1
+                    self._paused_until = max(self._paused_until, now + self.breaker_cooldown)
+                    self.limit = float(self.min_limit)
+                    self._failures = 0
+            elif latency > self.target_latency:
+                self._failures = 0
+                self.stats["spikes"] += 1
+                self._decrease(now)
+            else:
+                self._failures = 0
+                self._latency = latency if not self._latency else 0.8 * self._latency + 0.2 * latency
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.stats["limit_min"] = min(self.stats["limit_min"], int(self.limit))
+            self.stats["limit_max"] = max(self.stats["limit_max"], int(self.limit))
+            self._cond.notify_all()
+
+    def _decrease(self, now: float):
+        # One cut per round trip: responses already in flight reflect the old limit.
+        if now - self._last_cut < max(self._latency, 0.1):
+            return
+        self._last_cut = now
+        self.limit = max(float(self.min_limit), self.limit / 2)
+        self.stats["decreases"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            m = dict(self.stats, limit=int(self.limit), in_flight=self.in_flight,
+                     avg_latency_ms=round(self._latency * 1000, 1))
+        m["wait_s"] = round(m["wait_s"], 3)
+        return m
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that overlap in time: the first caller for a key runs fn,
+    callers arriving while it is in flight wait for and share its result (or exception).
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.stats = {"calls": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+                self.stats["calls"] += 1
+            else:
+                self.stats["shared"] += 1
+        if not leader:
+            return fut.result()
+        try:
+            fut.set_result(fn())
+        except BaseException as e:
+            fut.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return fut.result()
@@ -1,107 +1,269 @@
-import requests, urllib.parse, json
-from typing import Optional, Dict, Any, List
+import urllib.parse, json, time
+from typing import Optional, Dict, Any, List, Iterator, Union, TYPE_CHECKING
+from utils.concurrency import AdaptiveLimiter, SingleFlight, THROTTLED
+from utils.transport import make_transport
+
+if TYPE_CHECKING:
+    from utils.http_cache import HttpCache
+
+# requests (~100 ms to import) is loaded by the transport, not at import time of this module.
+
+_SEARCH = "/rest/api/content/search?"
+
+def _title_variants(t: str) -> List[str]:
+    return list(dict.fromkeys([t, t.replace("–","-"), t.replace("-","–"), " ".join(t.split())]))
+
+def _retry_after(resp) -> Optional[float]:
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
 
 class ConfluenceAPI:
-    def __init__(self, base_url: str, email: str, api_token: str, space_key: str):
+    def __init__(self, base_url: str, email: str, api_token: str, space_key: str,
+                 limiter: Optional[AdaptiveLimiter] = None, retries: int = 3, cache: Optional["HttpCache"] = None,
+                 transport: Any = "requests"):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.auth = (email, api_token)
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # A transport name from utils.transport.TRANSPORTS, or a ready-made transport object.
+        self.transport = make_transport(transport, email, api_token) if isinstance(transport, str) else transport
+        self.session = getattr(self.transport, "session", None)  # only the requests backend has one
         self.space_key = space_key
+        self.index = None  # optional PageIndex; when attached, title lookups are answered locally
+        self.limiter = limiter or AdaptiveLimiter()
+        self.retries = retries
+        self._flights = SingleFlight()
+        self.cache = cache  # optional on-disk GET cache, revalidated with ETag/Last-Modified
+
+    def attach_index(self, index):
+        self.index = index
     
     def _url(self, path: str) -> str:
         return f"{self.base_url}{path}"
+
+    def _request(self, method: str, path: str, **kw):
+        """Every HTTP call goes through here: the limiter gates it, and throttled calls are retried."""
+        kw.setdefault("timeout", 60)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            t0 = time.monotonic()
+            try:
+                r = self.transport.request(method, self._url(path), **kw)
+            except BaseException:  # any failure, not just network errors, must give the slot back
+                self.limiter.release(None, time.monotonic() - t0)
+                raise
+            wait = _retry_after(r) if r.status_code in THROTTLED else None
+            self.limiter.release(r.status_code, time.monotonic() - t0, wait)
+            if r.status_code not in THROTTLED or attempt == self.retries:
+                return r
+            if not wait:
+                time.sleep(min(0.5 * 2 ** attempt, 10))
+        return r
+
+    def _fetch_json(self, path: str):
+        if self.cache is None:
+            r = self._request("GET", path)
+            return r, (r.json() if r.ok else None)
+        url = self._url(path)
+        entry = self.cache.get(url)
+        if entry and self.cache.is_fresh(entry):
+            r = self.cache.response(url, entry)
+        else:
+            r = self._request("GET", path, headers=self.cache.validators(entry))
+            if r.status_code == 304 and entry:
+                r = self.cache.response(url, entry, revalidated=True)
+            else:
+                data = r.json() if r.ok else None
+                ids = [str(p.get("id")) for p in data.get("results", [])] if data and _SEARCH in path else None
+                self.cache.put(url, r, ids)
+                return r, data
+        return r, (r.json() if r.ok else None)
+
+    def _invalidate(self, page_id: Optional[str] = None, title: str = "", parent_id: Optional[str] = None):
+        """Forget cached reads a write by this client has made stale."""
+        if self.cache is None: return
+        frags = []
+        if page_id: frags.append(f"/rest/api/content/{page_id}")
+        if parent_id: frags.append(f"/rest/api/content/{parent_id}/child/page")
+        if title: frags += [f"title={urllib.parse.quote(v)}&" for v in _title_variants(title.strip())]
+        self.cache.invalidate(*frags)
+        # CQL searches are dropped only when their results list the page. One the write would add
+        # a page to (a new page matching a cached fuzzy title) is revalidated like any other entry,
+        # or served until --cache-ttl runs out; the exact-title lookup tried first is dropped above.
+        if page_id: self.cache.invalidate_pages(str(page_id))
+
+    def _get_json(self, path: str, missing_ok: bool = False) -> Any:
+        """
+        GET path and parse the JSON body. Identical GETs already in flight from other threads
+        share that one request and its parsed result, so treat the returned object as read-only.
+        A 404 returns None when missing_ok; any other error status raises.
+        """
+        r, data = self._flights.do(path, lambda: self._fetch_json(path))
+        if missing_ok and r.status_code == 404: return None
+        r.raise_for_status()
+        return data
+
+    def metrics(self) -> Dict[str, Any]:
+        m = self.limiter.metrics()
+        m["coalesced"] = self._flights.stats["shared"]
+        if self.cache is not None:
+            m.update({f"cache_{k}": v for k, v in self.cache.stats.items()})
+        if hasattr(self.transport, "report"):
+            m.update({f"cassette_{k}": v for k, v in self.transport.report().items()})
+        return m
+
+    def close(self):
+        self.transport.close()
+        if self.cache is not None: self.cache.close()
     
     def find_page_by_id(self, pid: str) -> Optional[Dict[str, Any]]:
         if not pid: return None
-        r = self.session.get(self._url(f"/rest/api/content/{pid}?expand=ancestors"))
-        if r.status_code==404: return None
-        r.raise_for_status()
-        return r.json()
+        return self._get_json(f"/rest/api/content/{pid}?expand=ancestors", missing_ok=True)
     
     def find_page_by_title(self, title: str) -> Optional[Dict[str, Any]]:
         if not title: return None
-        r = self.session.get(self._url(f"/rest/api/content?spaceKey={self.space_key}&title={urllib.parse.quote(title)}&expand=ancestors"))
-        r.raise_for_status()
-        j = r.json()
+        if self.index is not None: return self.index.find_by_title(title)
+        return self._fetch_by_title(title)
+
+    def _fetch_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        j = self._get_json(f"/rest/api/content?spaceKey={self.space_key}&title={urllib.parse.quote(title)}&expand=ancestors,version")
         return j["results"][0] if j.get("size",0)>0 else None
     
-    def find_page_relaxed(self, title: str) -> Optional[Dict[str, Any]]:
+    def find_page_relaxed(self, title: str, space_wide: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Exact title variants first, then a case-insensitive/fuzzy match. With an index attached
+        the lookup stays local; space_wide lets a miss on an index scoped to one subtree fall
+        through to the API, for pages (e.g. parents) that may live outside it.
+        """
         t = (title or "").strip()
         if not t: return None
-        variants = [t, t.replace("–","-"), t.replace("-","–"), " ".join(t.split())]
-        for v in variants:
-            p = self.find_page_by_title(v)
+        if self.index is not None:
+            for v in _title_variants(t):
+                p = self.index.find_by_title(v)
+                if p: return p
+            p = self.index.find_relaxed(t)
+            if p or not (space_wide and self.index.ancestor_id): return p
+        for v in _title_variants(t):
+            p = self._fetch_by_title(v)
             if p: return p
+        import requests
         cql = f'space="{self.space_key}" and type="page" and title ~ "{t}"'
-        r = self.session.get(self._url(f"/rest/api/content/search?cql={urllib.parse.quote(cql)}&limit=25"))
-        if r.status_code==200:
-            res = r.json().get("results", [])
-            for it in res:
-                if it.get("title","").lower()==t.lower(): return it
-            return res[0] if res else None
-        return None
+        try:
+            res = self._get_json(f"/rest/api/content/search?cql={urllib.parse.quote(cql)}&limit=25").get("results", [])
+        except requests.HTTPError:
+            return None
+        for it in res:
+            if it.get("title","").lower()==t.lower(): return it
+        return res[0] if res else None
     
-    def list_children(self, parent_id: str, limit: int = 500) -> List[Dict[str, Any]]:
-        r = self.session.get(self._url(f"/rest/api/content/{parent_id}/child/page?limit={limit}"))
-        r.raise_for_status()
-        return r.json().get("results", []) or []
+    def search_cql(self, cql: str, expand: str = "", limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield every result of a CQL content search, following pagination."""
+        start = 0
+        while True:
+            url = f"/rest/api/content/search?cql={urllib.parse.quote(cql)}&start={start}&limit={limit}"
+            if expand: url += f"&expand={expand}"
+            data = self._get_json(url)
+            yield from data.get("results", [])
+            if not data.get("_links", {}).get("next"): break
+            start += data.get("size", 0) or limit
+
+    def list_children(self, parent_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """All child pages of parent_id, following pagination (limit is the page size)."""
+        results: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            data = self._get_json(f"/rest/api/content/{parent_id}/child/page?start={start}&limit={limit}")
+            results.extend(data.get("results", []) or [])
+            if not data.get("_links", {}).get("next"): break
+            start += data.get("size", 0) or limit
+        return results
     
-    def create_page(self, title: str, body_html: str, parent_id: Optional[str] = None, labels: Optional[List[str]] = None) -> Dict[str, Any]:
+    def create_page(self, title: str, body_html: str, parent_id: Optional[str] = None, labels: Optional[List[str]] = None,
+                    adf_doc: Union[dict, str, None] = None) -> Dict[str, Any]:
+        """Create a page with a storage body, or with adf_doc (a dict or already-serialized ADF) as atlas_doc_format."""
+        if adf_doc is not None:
+            value = adf_doc if isinstance(adf_doc, str) else json.dumps(adf_doc)
+            body = {"atlas_doc_format": {"value": value, "representation": "atlas_doc_format"}}
+        else:
+            body = {"storage": {"value": body_html, "representation": "storage"}}
         payload = {
             "type": "page",
             "title": title,
             "space": {"key": self.space_key},
-            "body": {"storage": {"value": body_html, "representation": "storage"}}
+            "body": body
         }
         if parent_id:
             payload['ancestors'] = [{"id": parent_id}]
-        resp = self.session.post(self._url("/rest/api/content"), json=payload)
+        resp = self._request("POST", "/rest/api/content", json=payload)
         resp.raise_for_status()
         page = resp.json()
+        self._invalidate(page.get("id"), title, parent_id)
+        if self.index is not None: self.index.upsert(page, parent_id=parent_id or "")
         if labels:
             self.set_labels(page['id'], labels)
         return page
 
-    def update_page_body(self, page_id: str, title: str, body_html: str):
-        r = self.session.get(self._url(f"/rest/api/content/{page_id}?expand=version"))
+    def _current_version(self, page_id: str) -> int:
+        # Never from the cache: a stale version number is exactly what causes a 409.
+        r = self._request("GET", f"/rest/api/content/{page_id}?expand=version")
         r.raise_for_status()
-        ver = r.json()['version']['number']
+        return r.json()['version']['number']
+
+    def _put_version(self, page_id: str, payload: Dict[str, Any], version: Optional[int]):
+        """PUT the next version. A version known from planning saves the GET; on 409 it was stale, refetch once."""
+        url = f"/rest/api/content/{page_id}"
+        ver = version if version is not None else self._current_version(page_id)
+        payload["version"] = {"number": ver + 1}
+        resp = self._request("PUT", url, json=payload)
+        if resp.status_code == 409 and version is not None:
+            payload["version"] = {"number": self._current_version(page_id) + 1}
+            resp = self._request("PUT", url, json=payload)
+        return resp
+
+    def update_page_body(self, page_id: str, title: str, body_html: str, version: Optional[int] = None):
         payload = {
             "id": page_id,
             "type": "page",
             "title": title,
             "space": {"key": self.space_key},
-            "version": {"number": ver + 1},
             "body": {"storage": {"value": body_html, "representation": "storage"}}
         }
-        resp = self.session.put(self._url(f"/rest/api/content/{page_id}"), json=payload)
+        resp = self._put_version(page_id, payload, version)
         resp.raise_for_status()
+        page = resp.json()
+        self._invalidate(page_id, title)
+        if self.index is not None: self.index.upsert(page)
+        return page
+
+    def move_page(self, page_id: str, parent_id: str, title: str = ""):
+        """Re-parent a page (appended as the last child of parent_id)."""
+        resp = self._request("PUT", f"/rest/api/content/{page_id}/move/append/{parent_id}")
+        resp.raise_for_status()
+        self._invalidate(page_id, title, parent_id)
+        if self.cache is not None: self.cache.invalidate("/child/page?")  # the old parent's listing too
+        if self.index is not None and str(page_id) in self.index.pages:
+            self.index.pages[str(page_id)]["parent_id"] = str(parent_id)
         return resp.json()
 
     def set_labels(self, page_id: str, labels: List[str]):
         items = [{"prefix": "global", "name": l} for l in labels if l]
         if not items:
             return
-        resp = self.session.post(self._url(f"/rest/api/content/{page_id}/label"), json=items)
+        resp = self._request("POST", f"/rest/api/content/{page_id}/label", json=items)
         try:
             resp.raise_for_status()
         except Exception:
             pass
 
-    def update_page_adf(self, page_id: str, title: str, adf_doc: dict):
-        """Update page with ADF format using atlas_doc_format representation."""
-        # Get current version
-        r = self.session.get(self._url(f"/rest/api/content/{page_id}?expand=version"))
-        r.raise_for_status()
-        current_version = r.json()['version']['number']
-        
-        url = self._url(f"/rest/api/content/{page_id}")
+    def update_page_adf(self, page_id: str, title: str, adf_doc: Union[dict, str], version: Optional[int] = None):
+        """Update page with ADF format using atlas_doc_format representation. A str is sent as already-serialized ADF."""
+        value = adf_doc if isinstance(adf_doc, str) else json.dumps(adf_doc)
         payload = {
             "id": page_id, "type": "page", "title": title,
-            "version": {"number": current_version + 1},
-            "body": {"atlas_doc_format": {"value": json.dumps(adf_doc), "representation":"atlas_doc_format"}}
+            "body": {"atlas_doc_format": {"value": value, "representation":"atlas_doc_format"}}
         }
-        r = self.session.put(url, json=payload)
+        r = self._put_version(page_id, payload, version)
         r.raise_for_status()
-        return r.json()
\ No newline at end of file
+        page = r.json()
+        self._invalidate(page_id, title)
+        if self.index is not None: self.index.upsert(page)
+        return page
\ No newline at end of file
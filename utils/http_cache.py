@@ -0,0 +1,150 @@
+import os, json, time, sqlite3, threading
+from typing import Optional, Dict, Any, List
+
+
+class StoredResponse:
+    """The subset of requests.Response the client uses, rebuilt from stored bytes."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str = ""):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class HttpCache:
+    """
+    On-disk cache of GET responses (SQLite, so concurrent workers and crashes are safe).
+
+    Within ttl seconds of being stored or revalidated an entry is served without a request;
+    after that the client revalidates with If-None-Match / If-Modified-Since and a 304 costs no
+    payload. Total body size is kept under max_bytes by evicting least-recently-used entries.
+    """
+
+    def __init__(self, path: str, ttl: float = 0, max_bytes: int = 256 * 1024 * 1024):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, status INT, etag TEXT, last_modified TEXT,"
+            " headers TEXT, body BLOB, size INT, stored_at REAL, accessed_at REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+        # Which pages each stored search returned, so a write drops just the searches showing it.
+        self._db.execute("CREATE TABLE IF NOT EXISTS search_pages (url TEXT, page_id TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS search_pages_id ON search_pages (page_id)")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < 1:  # searches stored before that can't be traced
+            self._db.execute("DELETE FROM entries WHERE url LIKE '%/content/search?%'")
+            self._db.execute("PRAGMA user_version = 1")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0, "evicted": 0, "invalidated": 0}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, etag, last_modified, headers, body, stored_at FROM entries WHERE url=?", (url,)).fetchone()
+        if not row: return None
+        return {"status": row[0], "etag": row[1], "last_modified": row[2], "headers": json.loads(row[3]),
+                "body": row[4], "stored_at": row[5]}
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl > 0 and time.time() - entry["stored_at"] < self.ttl
+
+    @staticmethod
+    def validators(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not entry: return {}
+        h = {}
+        if entry["etag"]: h["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]: h["If-Modified-Since"] = entry["last_modified"]
+        return h
+
+    def response(self, url: str, entry: Dict[str, Any], revalidated: bool = False) -> StoredResponse:
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._db.execute("UPDATE entries SET stored_at=?, accessed_at=? WHERE url=?", (now, now, url))
+            else:
+                self._db.execute("UPDATE entries SET accessed_at=? WHERE url=?", (now, url))
+            self.stats["revalidated" if revalidated else "hits"] += 1
+            self.stats["bytes_saved"] += len(entry["body"])
+        return StoredResponse(entry["status"], entry["headers"], entry["body"], url)
+
+    def put(self, url: str, resp, page_ids: Optional[List[str]] = None):
+        """
+        Store a 200 response; only worth it when it can be revalidated or ttl allows reuse.
+        page_ids are the pages a search response lists, for invalidate_pages().
+        """
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if resp.status_code != 200 or not (etag or last_modified or self.ttl > 0):
+            return
+        body = resp.content
+        headers = {k: v for k, v in resp.headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        now = time.time()
+        with self._lock:
+            self.stats["misses"] += 1
+            old = self._db.execute("SELECT size FROM entries WHERE url=?", (url,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?,?,?,?)",
+                             (url, resp.status_code, etag, last_modified, json.dumps(headers), body, len(body), now, now))
+            self._size += len(body) - (old[0] if old else 0)
+            if page_ids is not None:
+                self._db.execute("DELETE FROM search_pages WHERE url=?", (url,))
+                self._db.executemany("INSERT INTO search_pages VALUES (?,?)", [(url, pid) for pid in page_ids])
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            rows = self._db.execute("SELECT url, size FROM entries ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows: break
+            for url, size in rows:
+                self._db.execute("DELETE FROM entries WHERE url=?", (url,))
+                self._db.execute("DELETE FROM search_pages WHERE url=?", (url,))
+                self._size -= size
+                self.stats["evicted"] += 1
+                if self._size <= self.max_bytes: break
+
+    def invalidate(self, *fragments: str):
+        """Drop every entry whose URL contains any of the fragments."""
+        with self._lock:
+            for frag in fragments:
+                like = "%" + frag.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                size, n = self._db.execute(
+                    "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries WHERE url LIKE ? ESCAPE '\\'", (like,)).fetchone()
+                if n:
+                    self._db.execute("DELETE FROM entries WHERE url LIKE ? ESCAPE '\\'", (like,))
+                    self._db.execute("DELETE FROM search_pages WHERE url LIKE ? ESCAPE '\\'", (like,))
+                    self._size -= size
+                    self.stats["invalidated"] += n
+
+    def invalidate_pages(self, *page_ids: str):
+        """Drop the stored searches whose results include any of the pages."""
+        with self._lock:
+            for pid in page_ids:
+                for (url,) in self._db.execute("SELECT DISTINCT url FROM search_pages WHERE page_id=?", (pid,)).fetchall():
+                    row = self._db.execute("SELECT size FROM entries WHERE url=?", (url,)).fetchone()
+                    self._db.execute("DELETE FROM entries WHERE url=?", (url,))
+                    self._db.execute("DELETE FROM search_pages WHERE url=?", (url,))
+                    if row:
+                        self._size -= row[0]
+                        self.stats["invalidated"] += 1
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,65 @@
+import os, pickle, hashlib
+from typing import Any, Callable, Dict
+
+# Bump when the shape of anything cached here changes (plan rows, TaskIndex).
+CACHE_VERSION = 2
+
+
+def _digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class InputCache:
+    """
+    Pickled results of parsing input files, so repeat runs skip JSON/CSV parsing and regrouping.
+
+    An entry is keyed by the file's absolute path and the loader name. It is used as-is while the
+    file's size and mtime are unchanged; if they changed but the content hash did not (a touch,
+    a checkout, a save without edits) the entry is re-stamped instead of rebuilt. Anything else
+    reparses. Loaders must return plain picklable data.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.stats = {"hits": 0, "rehashed": 0, "misses": 0}
+
+    def _entry_path(self, path: str, kind: str) -> str:
+        key = hashlib.sha1(f"{kind}\0{os.path.abspath(path)}".encode()).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{kind}-{key}.pkl")
+
+    def load(self, path: str, kind: str, loader: Callable[[str], Any]) -> Any:
+        st = os.stat(path)
+        entry_path = self._entry_path(path, kind)
+        entry: Dict[str, Any] = {}
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            entry = {}
+        if entry.get("version") == CACHE_VERSION:
+            if (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                self.stats["hits"] += 1
+                return entry["data"]
+            digest = _digest(path)
+            if entry["sha256"] == digest:
+                self.stats["rehashed"] += 1
+                self._store(entry_path, dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns))
+                return entry["data"]
+        else:
+            digest = _digest(path)
+        self.stats["misses"] += 1
+        data = loader(path)
+        self._store(entry_path, {"version": CACHE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                 "sha256": digest, "data": data})
+        return data
+
+    def _store(self, entry_path: str, entry: Dict[str, Any]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry_path)
@@ -0,0 +1,62 @@
+import os, json, threading, time
+from typing import Dict, Any, List
+
+
+class Journal:
+    """
+    Append-only JSONL record of completed plan actions, one line per action:
+    {"seq", "op", "title", "page_id", "parent_id", "version", "ts"}.
+
+    Each line is flushed and fsync'ed before the action counts as done, so after a crash the
+    file holds every finished write; a torn final line is ignored on load.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = self.load(path) if resume else []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a" if resume else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path: str) -> List[Dict[str, Any]]:
+        entries = []
+        if not os.path.isfile(path): return entries
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # interrupted mid-write; everything before it is intact
+        return entries
+
+    def record(self, action: Dict[str, Any], result: Dict[str, Any], parent_id=None):
+        entry = {
+            "seq": action["seq"], "op": action["op"], "title": action["title"],
+            "page_id": result.get("page_id"), "parent_id": parent_id,
+            "version": result.get("version"), "ts": round(time.time(), 3),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self.entries.append(entry)
+
+    def by_seq(self) -> Dict[int, Dict[str, Any]]:
+        return {e["seq"]: {"page_id": e["page_id"], "version": e["version"]} for e in self.entries}
+
+    def by_title(self) -> Dict[str, Dict[str, Any]]:
+        """Latest completed entry per title (later entries win, e.g. update after move)."""
+        return {e["title"]: e for e in self.entries}
+
+    def replay(self, index=None):
+        """Feed journaled pages into a PageIndex so lookups see pages created before the crash."""
+        if index is None: return
+        for e in self.entries:
+            if e.get("page_id") and e["op"] in ("create", "update"):
+                page = {"id": e["page_id"], "title": e["title"], "version": {"number": e.get("version") or 0}}
+                index.upsert(page, parent_id=e.get("parent_id") if e["op"] == "create" else None)
+
+    def close(self):
+        self._f.close()
@@ -0,0 +1,237 @@
+import re, html, pickle, hashlib, os
+from typing import Any, Dict, List, Optional, Tuple
+
+# The markdown subset used in plan descriptions, converted in one pass to Confluence storage
+# XHTML and to ADF block nodes together:
+#   # Heading .. ###### Heading     paragraphs (lines ending in two spaces break the line)
+#   - / * / + bullets, 1. / 1) numbered items, nested by indentation
+#   **bold** __bold__ *em* _em_ `code` [label](url)   ``` fenced code blocks
+# Results are memoized by content hash; treat the returned ADF nodes as read-only.
+
+_HEADING = re.compile(r"(#{1,6})\s+(.*?)\s*#*\s*$")
+_ITEM = re.compile(r"(\s*)([-*+]|\d+[.)])\s+(.*)")
+_FENCE = re.compile(r"\s*```")
+_INLINE = re.compile(
+    r"`([^`]+)`"
+    r"|\*\*(?=\S)(.+?)(?<=\S)\*\*(?!\*)|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)"
+    r"|\*(?![\s*])(.+?)(?<![\s*])\*(?!\*)|(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)"
+    r"|\[([^\]]+)\]\(([^)\s]+)\)")
+_BREAK = "\0"  # stands in for a hard line break inside a paragraph's text
+
+VERSION = 1  # bump when the output changes, so saved memos from older runs are ignored
+MEMO_MAX = 20000
+_MEMO: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+_NEW: set = set()  # keys converted by this process, for save_memo(new_only=True)
+stats = {"hits": 0, "misses": 0}
+
+
+def _esc(s: str) -> str:
+    return html.escape(s)
+
+
+def _text(s: str, marks: Tuple[Dict[str, Any], ...], out: List[str], nodes: List[Dict[str, Any]]):
+    for i, part in enumerate(s.split(_BREAK)):
+        if i:
+            out.append("<br/>")
+            nodes.append({"type": "hardBreak"})
+        if part:
+            out.append(_esc(part))
+            node = {"type": "text", "text": part.replace("\n", " ")}
+            if marks: node["marks"] = list(marks)
+            nodes.append(node)
+
+
+def _inline(s: str, marks: Tuple[Dict[str, Any], ...] = ()) -> Tuple[str, List[Dict[str, Any]]]:
+    """(XHTML, ADF inline nodes) of one block's text."""
+    out: List[str] = []
+    nodes: List[Dict[str, Any]] = []
+    pos = 0
+    for m in _INLINE.finditer(s):
+        _text(s[pos:m.start()], marks, out, nodes)
+        code, strong, strong2, em, em2, label, href = m.groups()
+        if code is not None:
+            out.append(f"<code>{_esc(code)}</code>")
+            # ADF only allows link next to the code mark
+            nodes.append({"type": "text", "text": code,
+                          "marks": [mk for mk in marks if mk["type"] == "link"] + [{"type": "code"}]})
+        elif label is not None:
+            inner, inner_nodes = _inline(label, marks + ({"type": "link", "attrs": {"href": href}},))
+            out.append(f'<a href="{_esc(href)}">{inner}</a>')
+            nodes += inner_nodes
+        else:
+            tag, mark = ("strong", "strong") if (strong or strong2) else ("em", "em")
+            inner, inner_nodes = _inline(strong or strong2 or em or em2, marks + ({"type": mark},))
+            out.append(f"<{tag}>{inner}</{tag}>")
+            nodes += inner_nodes
+        pos = m.end()
+    _text(s[pos:], marks, out, nodes)
+    return "".join(out), nodes
+
+
+def _paragraph(lines: List[str]) -> Tuple[str, Dict[str, Any]]:
+    text = "".join(l[:-2].rstrip() + _BREAK if l.endswith("  ") and i < len(lines) - 1 else l.strip() + "\n"
+                   for i, l in enumerate(lines)).strip()
+    inner, nodes = _inline(text)
+    node: Dict[str, Any] = {"type": "paragraph"}
+    if nodes: node["content"] = nodes
+    return f"<p>{inner}</p>", node
+
+
+def _list(lst: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    tag, kind = ("ol", "orderedList") if lst["ordered"] else ("ul", "bulletList")
+    out, items = [], []
+    for item in lst["items"]:
+        inner, nodes = _inline(" ".join(item["lines"]))
+        para: Dict[str, Any] = {"type": "paragraph"}
+        if nodes: para["content"] = nodes
+        content = [para]
+        child_html = []
+        for child in item["children"]:
+            h, n = _list(child)
+            child_html.append(h)
+            content.append(n)
+        out.append(f"<li>{inner}{''.join(child_html)}</li>")
+        items.append({"type": "listItem", "content": content})
+    return f"<{tag}>{''.join(out)}</{tag}>", {"type": kind, "content": items}
+
+
+def _parse(text: str) -> Tuple[str, List[Dict[str, Any]]]:
+    out: List[str] = []
+    blocks: List[Dict[str, Any]] = []
+    para: List[str] = []
+    stack: List[Dict[str, Any]] = []  # open lists, outermost first: {"indent","ordered","items"}
+    code: Optional[List[str]] = None
+
+    def emit(h, node):
+        out.append(h)
+        blocks.append(node)
+
+    def close_para():
+        if para:
+            emit(*_paragraph(para))
+            para.clear()
+
+    def close_lists():
+        if stack:
+            emit(*_list(stack[0]))
+            stack.clear()
+
+    for line in text.splitlines():
+        if code is not None:
+            if _FENCE.match(line):
+                body = "\n".join(code)
+                emit(f'<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[{body.replace("]]>", "]]]]><![CDATA[>")}]]>'
+                     "</ac:plain-text-body></ac:structured-macro>",
+                     {"type": "codeBlock", **({"content": [{"type": "text", "text": body}]} if body else {})})
+                code = None
+            else:
+                code.append(line)
+            continue
+        if not line.strip():
+            close_para()
+            continue
+        if _FENCE.match(line):
+            close_para(); close_lists()
+            code = []
+            continue
+        m = _ITEM.match(line)
+        if m:
+            close_para()
+            indent, marker, rest = len(m.group(1).expandtabs(4)), m.group(2), m.group(3)
+            ordered = marker[0].isdigit()
+            while len(stack) > 1 and stack[-1]["indent"] > indent:
+                stack.pop()
+            if stack and stack[0]["indent"] > indent:
+                stack[0]["indent"] = indent  # an outdent past the first item: same level as it
+            if stack and stack[-1]["indent"] == indent and stack[-1]["ordered"] != ordered:
+                if len(stack) == 1: close_lists()  # a bullet list followed by a numbered one
+                else: stack.pop()
+            item = {"lines": [rest.strip()], "children": []}
+            if stack and stack[-1]["indent"] == indent:
+                stack[-1]["items"].append(item)
+            else:
+                new = {"indent": indent, "ordered": ordered, "items": [item]}
+                if stack:
+                    stack[-1]["items"][-1]["children"].append(new)
+                stack.append(new)
+            continue
+        if stack and line[:1].isspace():
+            stack[-1]["items"][-1]["lines"].append(line.strip())  # continuation of the last item
+            continue
+        close_lists()
+        m = _HEADING.match(line)
+        if m:
+            close_para()
+            level = len(m.group(1))
+            inner, nodes = _inline(m.group(2))
+            node: Dict[str, Any] = {"type": "heading", "attrs": {"level": level}}
+            if nodes: node["content"] = nodes
+            emit(f"<h{level}>{inner}</h{level}>", node)
+            continue
+        para.append(line)
+    if code is not None:  # unterminated fence: keep the text
+        para.extend(code)
+    close_para()
+    close_lists()
+    return "".join(out), blocks
+
+
+def convert(text: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """(storage XHTML, ADF block nodes) of a markdown text, memoized by content hash."""
+    key = hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+    hit = _MEMO.get(key)
+    if hit is not None:
+        stats["hits"] += 1
+        return hit
+    stats["misses"] += 1
+    if len(_MEMO) >= MEMO_MAX:
+        _MEMO.clear()
+        _NEW.clear()
+    result = _MEMO[key] = _parse((text or "").strip("\n"))
+    _NEW.add(key)
+    return result
+
+
+def to_storage(text: str) -> str:
+    return convert(text)[0]
+
+
+def to_adf(text: str) -> List[Dict[str, Any]]:
+    return convert(text)[1]
+
+
+def load_memo(path: str):
+    """Seed the memo from a previous run's save_memo(path); a missing or unreadable file is ignored."""
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved.get("version") == VERSION:
+            _MEMO.update(saved["memo"])
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        pass
+
+
+def save_memo(path: str, new_only: bool = False):
+    """Write the memo; new_only writes just this process's own conversions (nothing if there are none)."""
+    memo = {k: _MEMO[k] for k in _NEW if k in _MEMO} if new_only else _MEMO
+    if new_only and not memo: return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"version": VERSION, "memo": memo}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def part_path(path: str) -> str:
+    """Where a render worker process leaves its conversions for the parent to merge."""
+    return f"{path}.{os.getpid()}.part"
+
+
+def merge_parts(path: str) -> int:
+    """Load and delete the worker files next to path; returns how many were merged."""
+    import glob
+    parts = glob.glob(glob.escape(path) + ".*.part")
+    for part in parts:
+        load_memo(part)
+        os.remove(part)
+    return len(parts)
@@ -0,0 +1,181 @@
+import os, json
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+
+# CQL dates are evaluated in the tenant user's timezone while version.when is UTC,
+# so the delta window reaches back far enough to cover any offset (UTC-12..UTC+14).
+OVERLAP = timedelta(hours=15)
+DELTA_STATUSES = '"current","trashed","deleted"'
+SUBTREE_BATCH = 50  # page ids per "ancestor in (...)" query when pages move into the scope
+
+
+def relaxed_key(title: str) -> str:
+    return title.strip().lower()
+
+
+class PageIndex:
+    """
+    Local snapshot of the pages in a space (optionally only those under one ancestor).
+
+    The first refresh crawls the scope once; later refreshes only fetch pages (current or
+    trashed) whose lastmodified is past the watermark, and apply inserts, renames, moves and
+    deletions to the local copy; a page moved into or out of the ancestor's subtree brings or
+    takes its own descendants. Saved as JSON so the next run starts warm.
+
+    With an ancestor, pages outside that subtree are not in the index: a miss there is not
+    proof the page doesn't exist (see ConfluenceAPI.find_page_relaxed(space_wide=True)).
+    """
+
+    def __init__(self, space_key: str, ancestor_id: str = "", path: str = ""):
+        self.space_key = space_key
+        self.ancestor_id = ancestor_id or ""
+        self.path = path
+        self.pages: Dict[str, Dict[str, Any]] = {}  # id -> {"title","parent_id","version","when"}
+        self.by_title: Dict[str, str] = {}
+        self.by_relaxed: Dict[str, List[str]] = {}  # relaxed_key(title) -> ids, oldest first
+        self.watermark = ""  # newest version.when seen (ISO-8601, UTC)
+
+    @classmethod
+    def load(cls, path: str, space_key: str, ancestor_id: str = "") -> "PageIndex":
+        idx = cls(space_key, ancestor_id, path)
+        if path and os.path.isfile(path):
+            with open(path) as f:
+                data = json.load(f)
+            # A snapshot of another space/scope is useless; start over with a full crawl.
+            if data.get("space_key") == space_key and data.get("ancestor_id", "") == idx.ancestor_id:
+                idx.pages = data.get("pages", {})
+                idx.watermark = data.get("watermark", "")
+                idx._reindex()
+        return idx
+
+    def save(self, path: str = ""):
+        path = path or self.path
+        if not path: return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"space_key": self.space_key, "ancestor_id": self.ancestor_id,
+                       "watermark": self.watermark, "pages": self.pages}, f)
+        os.replace(tmp, path)
+
+    def _reindex(self):
+        self.by_title = {p["title"]: pid for pid, p in self.pages.items()}
+        self.by_relaxed = {}
+        for pid, p in self.pages.items():
+            self.by_relaxed.setdefault(relaxed_key(p["title"]), []).append(pid)
+
+    def _forget_title(self, title: str, pid: str):
+        if self.by_title.get(title) == pid:
+            del self.by_title[title]
+        ids = self.by_relaxed.get(relaxed_key(title))
+        if ids and pid in ids:
+            ids.remove(pid)
+            if not ids: del self.by_relaxed[relaxed_key(title)]
+
+    def _as_page(self, pid: str) -> Dict[str, Any]:
+        # Same shape find_page_by_title returns for the fields callers use.
+        p = self.pages[pid]
+        return {
+            "id": pid, "title": p["title"],
+            "ancestors": [{"id": p["parent_id"]}] if p.get("parent_id") else [],
+            "version": {"number": p.get("version", 0), "when": p.get("when", "")},
+        }
+
+    def find_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        pid = self.by_title.get(title)
+        return self._as_page(pid) if pid else None
+
+    def find_relaxed(self, title: str) -> Optional[Dict[str, Any]]:
+        """A page whose title matches ignoring case and surrounding whitespace."""
+        ids = self.by_relaxed.get(relaxed_key(title or ""))
+        return self._as_page(ids[0]) if ids else None
+
+    def upsert(self, page: Dict[str, Any], parent_id: Optional[str] = None) -> str:
+        """Apply one page as returned by the REST API. Returns insert/rename/move/update/unchanged."""
+        pid = str(page["id"])
+        old = self.pages.get(pid)
+        ancestors = page.get("ancestors")
+        if parent_id is None:
+            if ancestors: parent_id = str(ancestors[-1]["id"])
+            elif ancestors is None and old: parent_id = old.get("parent_id", "")  # write responses omit ancestors
+            else: parent_id = ""
+        ver = page.get("version") or {}
+        new = {"title": page.get("title", ""), "parent_id": parent_id,
+               "version": ver.get("number", 0), "when": ver.get("when", "")}
+        self.pages[pid] = new
+        if new["when"] > self.watermark:
+            self.watermark = new["when"]
+        if old is None:
+            self.by_title[new["title"]] = pid
+            self.by_relaxed.setdefault(relaxed_key(new["title"]), []).append(pid)
+            return "insert"
+        if old["title"] != new["title"]:
+            self._forget_title(old["title"], pid)
+            self.by_title[new["title"]] = pid
+            self.by_relaxed.setdefault(relaxed_key(new["title"]), []).append(pid)
+            return "rename"
+        if old.get("parent_id") != new["parent_id"]:
+            return "move"
+        return "update" if old.get("version") != new["version"] else "unchanged"
+
+    def remove(self, pid: str) -> bool:
+        p = self.pages.pop(str(pid), None)
+        if p is None: return False
+        self._forget_title(p["title"], str(pid))
+        return True
+
+    def _in_scope(self, page: Dict[str, Any]) -> bool:
+        if not self.ancestor_id: return True
+        return any(str(a.get("id")) == self.ancestor_id for a in page.get("ancestors") or [])
+
+    def _since(self) -> str:
+        wm = datetime.strptime(self.watermark[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        return (wm - OVERLAP).strftime("%Y-%m-%d %H:%M")
+
+    def refresh(self, api, full: bool = False) -> Dict[str, int]:
+        """Bring the snapshot up to date. Cost scales with the number of changed pages."""
+        stats = {"insert": 0, "rename": 0, "move": 0, "update": 0, "unchanged": 0, "delete": 0}
+        scope = f'space="{self.space_key}" and type=page'
+        if full or not self.watermark:
+            self.pages, self.by_title, self.by_relaxed, self.watermark = {}, {}, {}, ""
+            cql = scope + (f" and ancestor={self.ancestor_id}" if self.ancestor_id else "")
+            for page in api.search_cql(cql, expand="ancestors,version"):
+                stats[self.upsert(page)] += 1
+            return stats
+
+        # Query space-wide so pages moved *out* of the ancestor are seen and dropped. CQL only
+        # matches current content unless asked; trashing a page bumps its lastmodified, so the
+        # same window also reports the deletions.
+        cql = scope + f' and status in ({DELTA_STATUSES}) and lastmodified >= "{self._since()}"'
+        entered, left = [], []
+        for page in api.search_cql(cql, expand="ancestors,version"):
+            current = page.get("status", "current") == "current"
+            if current and self._in_scope(page):
+                change = self.upsert(page)
+                stats[change] += 1
+                if change == "insert" and self.ancestor_id: entered.append(str(page["id"]))
+            elif self.remove(page["id"]):
+                stats["delete"] += 1
+                if current: left.append(str(page["id"]))
+        # A move only bumps the moved page's lastmodified, not its descendants'. A page that
+        # entered the scope brings its subtree along, and one that left it takes its subtree with it.
+        for i in range(0, len(entered), SUBTREE_BATCH):
+            ids = ",".join(entered[i:i + SUBTREE_BATCH])
+            for page in api.search_cql(scope + f" and ancestor in ({ids})", expand="ancestors,version"):
+                stats[self.upsert(page)] += 1
+        stats["delete"] += self._remove_subtrees(left)
+        return stats
+
+    def _remove_subtrees(self, roots: List[str]) -> int:
+        """Drop the indexed descendants of the given (already removed) pages; returns how many."""
+        if not roots: return 0
+        children: Dict[str, List[str]] = {}
+        for pid, p in self.pages.items():
+            children.setdefault(p.get("parent_id", ""), []).append(pid)
+        todo, n = list(roots), 0
+        while todo:
+            for pid in children.get(todo.pop(), []):
+                if self.remove(pid):
+                    n += 1
+                    todo.append(pid)
+        return n
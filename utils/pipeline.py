@@ -0,0 +1,71 @@
+import threading, time
+from concurrent.futures import Executor, Future
+from typing import Dict, Any, Callable, Hashable, Iterable, Tuple
+
+
+class RenderAhead:
+    """
+    Bounded render stage in front of the publishers: a feeder thread submits fn(arg) for each
+    (key, arg) job to executor, in job order, while publishers are busy with the network.
+    At most `depth` rendered-but-unpublished results exist at once (backpressure), so memory
+    stays bounded however large the plan is.
+
+    take(key) returns the result for key, waiting if it is still rendering. A key the feeder
+    has not reached yet is rendered inline by the caller, so a stalled queue (e.g. results for
+    actions that will never publish because their parent failed) slows the pipeline down but
+    can never deadlock it.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[Hashable, Any]], fn: Callable[[Any], Any], executor: Executor,
+                 depth: int = 64):
+        self._fn = fn
+        self._executor = executor
+        self._slots = threading.Semaphore(max(1, depth))
+        self._cond = threading.Condition()
+        self._futures: Dict[Hashable, Future] = {}
+        self._claimed = set()
+        self._stopped = False
+        self.stats = {"rendered_ahead": 0, "rendered_inline": 0, "render_wait_s": 0.0}
+        self._jobs = list(jobs)
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+    def _feed(self):
+        for key, arg in self._jobs:
+            self._slots.acquire()
+            with self._cond:
+                if self._stopped: return
+                if key in self._claimed:
+                    self._slots.release()
+                    continue
+                self._futures[key] = self._executor.submit(self._fn, arg)
+                self.stats["rendered_ahead"] += 1
+                self._cond.notify_all()
+
+    def take(self, key: Hashable, arg: Any) -> Any:
+        with self._cond:
+            fut = self._futures.pop(key, None)
+            if fut is None:
+                self._claimed.add(key)
+                self.stats["rendered_inline"] += 1
+        if fut is None:
+            return self._fn(arg)
+        t0 = time.monotonic()
+        try:
+            return fut.result()
+        finally:
+            self._slots.release()
+            with self._cond:
+                self.stats["render_wait_s"] += time.monotonic() - t0
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            for fut in self._futures.values():
+                fut.cancel()
+            self._futures.clear()
+        self._slots.release()  # wake a feeder blocked on a full queue so it can exit
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self.stats, render_wait_s=round(self.stats["render_wait_s"], 3))
@@ -0,0 +1,133 @@
+import sys
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class PageType(str, Enum):
+    """Page types of the plan. Members are str, so they compare equal to the plain strings."""
+    SUBCOMPONENT = "Subcomponent"
+    OPTION = "Option"
+    TASKS = "Tasks"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+_PAGE_TYPES = {t.value: t for t in PageType}
+
+# attribute -> column name in the plan JSON/CSV, in the order the generators write them
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("parent_page", "Parent Page"),
+    ("title", "Page Title"),
+    ("page_type", "Page Type"),
+    ("code", "Code / Ref"),
+    ("description", "Description / Notes"),
+    ("complexity", "Complexity"),
+    ("modes", "Mode Applicability"),
+    ("flag", "Validation / Cleanup Flag"),
+    ("labels", "Labels"),
+    ("action", "Recommended Action"),
+)
+ATTR = {col: attr for attr, col in FIELDS}
+COLUMNS = tuple(col for _, col in FIELDS)
+# Everything but the description is interned: low-cardinality columns collapse to one string
+# each, and a page's title, its children's Parent Page and its Tasks page's Code / Ref share one.
+_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _layout(keys: Iterable[str]) -> Tuple[str, ...]:
+    t = tuple(keys)
+    return _LAYOUTS.setdefault(t, t)
+
+
+class PlanRow:
+    """
+    One row of the page creation plan. Known columns are slots (row.title, row.page_type, ...);
+    page types are PageType members and repeated values are interned. The description, the one
+    long field, is kept UTF-8 encoded and decoded when read. The row also remembers which columns
+    its source had and in what order (one shared tuple per distinct layout), so to_dict()
+    round-trips the JSON exactly. get()/[] accept the column names for code written against
+    plain dict rows.
+    """
+    __slots__ = ("parent_page", "title", "page_type", "code", "_description", "complexity", "modes",
+                 "flag", "labels", "action", "_layout", "extra")
+
+    def __init__(self, parent_page: Any = "", title: Any = "", page_type: Any = "", code: Any = "",
+                 description: Any = "", complexity: Any = "", modes: Any = "", flag: Any = "",
+                 labels: Any = "", action: Any = "", extra: Optional[Dict[str, Any]] = None,
+                 layout: Optional[Tuple[str, ...]] = None):
+        self.parent_page = sys.intern(parent_page) if isinstance(parent_page, str) else parent_page
+        self.title = sys.intern(title) if isinstance(title, str) else title
+        self.page_type = _PAGE_TYPES.get(page_type, page_type) if isinstance(page_type, str) else page_type
+        self.code = sys.intern(code) if isinstance(code, str) else code
+        self.description = description
+        self.complexity = sys.intern(complexity) if isinstance(complexity, str) else complexity
+        self.modes = sys.intern(modes) if isinstance(modes, str) else modes
+        self.flag = sys.intern(flag) if isinstance(flag, str) else flag
+        self.labels = sys.intern(labels) if isinstance(labels, str) else labels
+        self.action = sys.intern(action) if isinstance(action, str) else action
+        self.extra = extra or None
+        self._layout = layout or _layout(COLUMNS + tuple(self.extra or ()))
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "PlanRow":
+        kw = {ATTR[k]: v for k, v in d.items() if k in ATTR}
+        extra = {k: v for k, v in d.items() if k not in ATTR}
+        return cls(**kw, extra=extra, layout=_layout(d))
+
+    @property
+    def description(self) -> Any:
+        d = self._description
+        return d.decode("utf-8") if isinstance(d, bytes) else d
+
+    @description.setter
+    def description(self, value: Any):
+        self._description = value.encode("utf-8") if isinstance(value, str) else value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._layout:
+            return default
+        attr = ATTR.get(key)
+        v = getattr(self, attr) if attr else self.extra[key]
+        return v.value if isinstance(v, PageType) else v
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._layout:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._layout
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._layout
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self.get(k) for k in self._layout}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PlanRow):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PlanRow({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
+
+    def __setstate__(self, state):
+        for s, v in zip(self.__slots__, state):
+            object.__setattr__(self, s, v)
+        self._layout = _layout(self._layout)  # share layout tuples again after unpickling
+
+
+def plan_rows(dicts: Iterable[Dict[str, Any]]) -> List[PlanRow]:
+    return [PlanRow.from_dict(d) for d in dicts]
+
+
+def to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Plain dicts for json/csv writers (dict rows pass through)."""
+    return [r.to_dict() if isinstance(r, PlanRow) else r for r in rows]
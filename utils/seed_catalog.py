@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Option and task templates for the seed generators (data/seed_catalog.json):
+#   components.<F.0x>.subcomponents.<n>: {"name", "options": [{letter, title, complexity, mvp,
+#                                         production, enterprise, notes}, ...]}
+#   components.<F.0x>.tasks.<n.L>:      [{title, description, complexity, mvp, production,
+#                                         enterprise, role, notes}, ...]
+#   default_tasks:                      tasks of options the catalog has none for
+# Keys are the code minus its component, so F.01.1 -> ("F.01", "1") and F.01.1.A -> ("F.01", "1.A").
+# "{option_ref}" in task text is replaced by the option's code.
+
+DEFAULT_PATH = "data/seed_catalog.json"
+MODES = (("mvp", "MVP"), ("production", "Production"), ("enterprise", "Enterprise"))
+
+
+def split_code(code: str) -> Tuple[str, str]:
+    """("F.01", "1.A") for F.01.1.A: the component and the rest of the code."""
+    parts = code.strip().split(".")
+    return ".".join(parts[:2]), ".".join(parts[2:])
+
+
+def mode_list(option: Dict[str, str]) -> str:
+    """Modes an option applies to (any mark but ❌/No), as in the plan's Mode Applicability."""
+    return ",".join(name for key, name in MODES if option.get(key, "") not in ("", "❌", "No"))
+
+
+class SeedCatalog:
+    """The catalog compiled into dicts keyed by (component, subcomponent) and (component, option suffix)."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.options: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        self.tasks: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        for comp, body in (data.get("components") or {}).items():
+            for n, sc in (body.get("subcomponents") or {}).items():
+                self.options[comp, n] = sc.get("options") or []
+            for suffix, tasks in (body.get("tasks") or {}).items():
+                self.tasks[comp, suffix] = tasks or []
+        self.default_tasks: List[Dict[str, str]] = data.get("default_tasks") or []
+
+    def options_for(self, sc_code: str, component: Optional[str] = None) -> List[Dict[str, str]]:
+        """Options of a subcomponent; component overrides the one in the code."""
+        comp, n = split_code(sc_code)
+        return self.options.get((component or comp, n), [])
+
+    def tasks_for(self, option_ref: str, component: Optional[str] = None, default: bool = False) -> List[Dict[str, str]]:
+        """Tasks of an option with {option_ref} filled in; default_tasks if it has none and default is set."""
+        comp, suffix = split_code(option_ref)
+        tasks = self.tasks.get((component or comp, suffix))
+        if tasks is None:
+            tasks = self.default_tasks if default else []
+        return [{k: v.replace("{option_ref}", option_ref) if "{" in v else v for k, v in t.items()} for t in tasks]
+
+
+def load_catalog(path: str = DEFAULT_PATH) -> SeedCatalog:
+    with open(path, encoding="utf-8") as f:
+        return SeedCatalog(json.load(f))
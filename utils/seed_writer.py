@@ -0,0 +1,90 @@
+import io, csv, json
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Dict, IO, List
+
+# Incremental writers for the seed generators: rows go to disk as they are generated, and the
+# files come out byte-identical to dumping the complete list at the end. Rows can also be
+# encoded elsewhere (json_item, CsvLines; e.g. in worker processes) and written as text.
+
+
+def json_item(item: Any, indent: int = 2, ensure_ascii: bool = True) -> str:
+    """An item's text as json.dump(items, f, indent=indent) writes it inside the array."""
+    pad = " " * indent
+    if isinstance(item, dict) and item and all(isinstance(v, str) for v in item.values()):
+        # flat string rows (every seed row): json's indenting encoder is pure Python, so format directly
+        enc = encode_basestring_ascii if ensure_ascii else encode_basestring
+        sep = ",\n" + pad * 2
+        return "{\n" + pad * 2 + sep.join(f"{enc(k)}: {enc(v)}" for k, v in item.items()) + "\n" + pad + "}"
+    return json.dumps(item, indent=indent, ensure_ascii=ensure_ascii).replace("\n", "\n" + pad)
+
+
+class CsvLines:
+    """Formats rows as the CSV text csv.writer would write for them."""
+
+    def __init__(self, lineterminator: str = "\r\n"):
+        self.buf = io.StringIO()
+        self.writer = csv.writer(self.buf, lineterminator=lineterminator)
+
+    def __call__(self, *rows: List[Any]) -> str:
+        self.buf.seek(0)
+        self.buf.truncate()
+        self.writer.writerows(rows)
+        return self.buf.getvalue()
+
+
+class JsonListWriter:
+    """A JSON array written item by item; same bytes as json.dump(items, f, indent=indent, ...)."""
+
+    def __init__(self, f: IO[str], indent: int = 2, ensure_ascii: bool = True):
+        self.f = f
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+
+    def write(self, item: Any):
+        self.write_encoded(json_item(item, self.indent, self.ensure_ascii))
+
+    def write_encoded(self, text: str):
+        """Append an item already encoded by json_item() with this writer's settings."""
+        self.f.write(("[\n" if not self.count else ",\n") + " " * self.indent + text)
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "[]")
+
+
+class CsvRowWriter:
+    """
+    csv.DictWriter taking its header from the first row (every row of a seed file has the same
+    keys). With no rows the file is left empty, or gets an empty header line if empty_header.
+    """
+
+    def __init__(self, f: IO[str], lineterminator: str = "\r\n", empty_header: bool = False):
+        self.f = f
+        self.lineterminator = lineterminator
+        self.empty_header = empty_header
+        self.writer = None
+        self.fields = None
+        self.count = 0
+
+    def write(self, row: Dict[str, Any]):
+        if self.writer is None:
+            self._header(list(row))
+        self.writer.writerow([row.get(k, "") for k in self.fields])  # as DictWriter, minus its per-row key check
+        self.count += 1
+
+    def write_lines(self, text: str, fields: List[str], rows: int = 1):
+        """Append rows already formatted by CsvLines with this writer's line terminator."""
+        if self.writer is None:
+            self._header(fields)
+        self.f.write(text)
+        self.count += rows
+
+    def _header(self, fields: List[str]):
+        self.fields = fields
+        self.writer = csv.writer(self.f, lineterminator=self.lineterminator)
+        self.writer.writerow(fields)
+
+    def close(self):
+        if self.writer is None and self.empty_header:
+            csv.writer(self.f, lineterminator=self.lineterminator).writerow([])
@@ -0,0 +1,51 @@
+import re
+from collections import defaultdict
+from typing import Dict, Any, List
+from utils.plan_row import PlanRow
+
+_COMPONENT = re.compile(r"\bF\.(\d+)")
+
+
+def component_of(row: PlanRow) -> str:
+    """Top-level component (e.g. 'F.01') of a plan row, from Code / Ref, then Labels, then the title."""
+    for value in (row.code, row.labels, row.title):
+        m = _COMPONENT.search(value or "")
+        if m: return f"F.{int(m.group(1)):02d}"
+    return ""
+
+
+def partition(rows: List[PlanRow], shards: int) -> List[List[PlanRow]]:
+    """
+    Split rows into at most `shards` groups without splitting a component: a component's
+    subtree only depends on pages inside it (and on the component page, which already exists).
+    Largest components are placed first, each on the currently smallest shard. Row order is
+    kept within each shard.
+    """
+    groups: Dict[str, List[PlanRow]] = defaultdict(list)
+    for r in rows:
+        groups[component_of(r)].append(r)
+    bins: List[List[PlanRow]] = [[] for _ in range(max(1, min(shards, len(groups))))]
+    for comp in sorted(groups, key=lambda c: (-len(groups[c]), c)):
+        min(bins, key=len).extend(groups[comp])
+    order = {id(r): i for i, r in enumerate(rows)}
+    return [sorted(b, key=lambda r: order[id(r)]) for b in bins if b]
+
+
+def merge_metrics(metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-shard ConfluenceAPI.metrics(): counters add up, limits keep their extremes."""
+    merged: Dict[str, Any] = {}
+    for m in metrics:
+        for k, v in m.items():
+            if k not in merged:
+                merged[k] = v
+            elif k == "limit_min":
+                merged[k] = min(merged[k], v)
+            elif k == "limit_max":
+                merged[k] = max(merged[k], v)
+            elif k == "avg_latency_ms":
+                merged[k] = max(merged[k], v)
+            elif isinstance(v, bool):
+                merged[k] = merged[k] and v
+            elif isinstance(v, (int, float)):
+                merged[k] = round(merged[k] + v, 3)
+    return merged
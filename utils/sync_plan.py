@@ -0,0 +1,195 @@
+import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from utils.plan_row import PlanRow
+
+# An action is a plain dict so a plan can be written to JSON, reviewed and applied later:
+#   seq           position in the plan (stable id other actions refer to)
+#   op            create | update | move | skip
+#   title         page title
+#   page_id       existing page id (update/move/skip), None for create
+#   version       existing version number when known, saves a GET before the update
+#   parent_title  parent page title from the plan row
+#   parent_id     resolved parent id, None while the parent is itself created by this plan
+#   after         seq of the action that must finish first; for create/move its page becomes the parent
+#   labels        labels to set
+#   row           the PlanRow, used to render the body at apply time (a plain dict in the JSON)
+OPS = ("create", "update", "move", "skip")
+
+
+def _labels(row: PlanRow) -> List[str]:
+    return [l.strip() for l in (row.labels or "").split(";") if l.strip()]
+
+
+def compile_plan(rows: List[PlanRow], api, root: str, root_id: str = "",
+                 update: bool = False, move: bool = False, limit: int = 0,
+                 completed: Optional[Dict[str, Dict[str, Any]]] = None, workers: int = 1) -> List[Dict[str, Any]]:
+    """
+    Resolve every row against the space (or an attached PageIndex) and return the action list.
+    Lookups are memoized per title, so rows sharing a parent cost one lookup between them.
+    Titles in completed (Journal.by_title() of an interrupted run) become skips without a lookup.
+    With workers > 1 the lookups are prefetched concurrently before the (sequential) decisions.
+    """
+    completed = completed or {}
+    if limit: rows = rows[:limit]
+    # The journaled parent stands in for ancestors, so a page whose move already finished isn't moved again.
+    found: Dict[str, Optional[Dict[str, Any]]] = {
+        t: {"id": e["page_id"], "version": {"number": e.get("version")},
+            "ancestors": [{"id": e["parent_id"]}] if e.get("parent_id") else []}
+        for t, e in completed.items() if e.get("page_id")
+    }
+    def find(title):
+        # find_page_relaxed tries the exact title first, so this is find_page_by_title(t) or relaxed(t).
+        return api.find_page_relaxed(title)
+    def lookup(title):
+        if title not in found:
+            found[title] = find(title)
+        return found[title]
+    def prefetch(titles):
+        todo = list(dict.fromkeys(t for t in titles if t not in found))
+        if workers <= 1 or len(todo) < 2: return
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            found.update(zip(todo, pool.map(find, todo)))
+
+    # Wave 1: the pages themselves. Wave 2: parents, only needed for creates (and moves).
+    prefetch((r.title or "").strip() for r in rows)
+    parents = [(r.parent_page or "").strip() for r in rows
+               if move or not found.get((r.title or "").strip())]
+    prefetch([t for t in parents if not (root_id and t in ("", root))] + ([] if root_id else [root]))
+
+    planned: Dict[str, int] = {}  # title -> seq of the action creating it
+    outside: Dict[str, Optional[Dict[str, Any]]] = {}
+    scoped = bool(getattr(getattr(api, "index", None), "ancestor_id", ""))
+    def lookup_outside(title):
+        # A parent missing from an index scoped to the root's subtree may still exist elsewhere in the space.
+        if not scoped: return None  # lookup() already searched the whole space
+        if title not in outside:
+            outside[title] = api.find_page_relaxed(title, space_wide=True)
+        return outside[title]
+    def resolve_parent(parent_title) -> Tuple[Optional[str], Optional[int], bool]:
+        """(parent_id, after, exact); exact is False when falling back to the root."""
+        if root_id and (not parent_title or parent_title == root):
+            return root_id, None, True
+        p = lookup(parent_title)
+        if p: return p["id"], None, True
+        if parent_title in planned: return None, planned[parent_title], True
+        p = lookup_outside(parent_title)
+        if p: return p["id"], None, True
+        if root_id: return root_id, None, False
+        r = lookup(root)
+        return (r["id"] if r else None), None, False
+
+    actions: List[Dict[str, Any]] = []
+    def add(op, title, row, page=None, parent_id=None, after=None):
+        ver = (page or {}).get("version") or {}
+        actions.append({
+            "seq": len(actions), "op": op, "title": title,
+            "page_id": page["id"] if page else None, "version": ver.get("number"),
+            "parent_title": (row.parent_page or "").strip(),
+            "parent_id": parent_id, "after": after, "labels": _labels(row), "row": row,
+        })
+        return actions[-1]
+
+    for row in rows:
+        title = (row.title or "").strip()
+        if not title: continue
+        parent_title = (row.parent_page or "").strip()
+
+        existing = lookup(title)
+        if not existing and row.get("Previous Title"):
+            existing = lookup(row.get("Previous Title"))  # renamed by the update, e.g. "(2/2)" -> "(2/3)"
+        if title in completed and completed[title]["op"] != "move":
+            add("skip", title, row, existing)
+            continue
+        if existing:
+            moved = None
+            if move:
+                parent_id, after, exact = resolve_parent(parent_title)
+                ancestors = existing.get("ancestors") or []
+                current = str(ancestors[-1]["id"]) if ancestors else ""
+                if exact and (after is not None or (parent_id and str(parent_id) != current)):
+                    moved = add("move", title, row, existing, parent_id, after)["seq"]
+            # Chained after its own move so the two writes to the page never race.
+            add("update" if update else "skip", title, row, existing, after=moved)
+            continue
+
+        parent_id, after, _ = resolve_parent(parent_title)
+        planned[title] = add("create", title, row, None, parent_id, after)["seq"]
+    return actions
+
+
+def save_plan(actions: List[Dict[str, Any]], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(actions, f, indent=2, ensure_ascii=False, default=PlanRow.to_dict)
+
+
+def load_plan(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        actions = json.load(f)
+    for a in actions:
+        a["row"] = PlanRow.from_dict(a["row"])
+    return actions
+
+
+def describe(action: Dict[str, Any]) -> str:
+    op, title = action["op"], action["title"]
+    if op == "create":
+        parent = action["parent_id"] if action["after"] is None else f"<#{action['after']}>"
+        return f"[CREATE] '{title}' under '{action['parent_title']}' (parent_id={parent})"
+    if op == "move":
+        parent = action["parent_id"] if action["after"] is None else f"<#{action['after']}>"
+        return f"[MOVE] '{title}' -> '{action['parent_title']}' (parent_id={parent})"
+    return f"[{op.upper()}] {title}"
+
+
+def execute_plan(actions: List[Dict[str, Any]], fn: Callable[[Dict[str, Any], Optional[str]], Dict[str, Any]],
+                 workers: int = 4, done: Optional[Dict[int, Dict[str, Any]]] = None) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, str]]:
+    """
+    Run fn(action, parent_id) for every action on a thread pool. An action with "after" set
+    waits for that action and receives the page id it produced as parent_id; siblings run in
+    parallel. If an action fails, everything that depends on it is reported as blocked.
+    Actions already in done ({seq: result}, e.g. Journal.by_seq()) are not run again.
+    Returns ({seq: result}, {seq: error}).
+    """
+    results: Dict[int, Dict[str, Any]] = dict(done or {})
+    errors: Dict[int, str] = {}
+    waiting: Dict[int, List[Dict[str, Any]]] = {}
+    ready: List[Dict[str, Any]] = []
+    for a in actions:
+        if a["seq"] in results:
+            continue
+        if a["after"] is None or a["after"] in results:
+            ready.append(a)
+        else:
+            waiting.setdefault(a["after"], []).append(a)
+
+    def parent_of(a):
+        if a["after"] is None: return a["parent_id"]
+        return results[a["after"]].get("page_id")
+
+    def block(seq, why):
+        for d in waiting.pop(seq, []):
+            errors[d["seq"]] = why
+            block(d["seq"], why)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {}
+        while ready or running:
+            while ready:
+                a = ready.pop(0)
+                running[pool.submit(fn, a, parent_of(a))] = a
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                a = running.pop(fut)
+                try:
+                    results[a["seq"]] = fut.result() or {}
+                except Exception as e:
+                    errors[a["seq"]] = f"{type(e).__name__}: {e}"
+                    block(a["seq"], f"blocked by #{a['seq']}")
+                    continue
+                ready.extend(waiting.pop(a["seq"], []))
+    # Dependencies on actions outside this list (e.g. a shard of a bigger plan) never resolve.
+    for seq, deps in list(waiting.items()):
+        for d in deps:
+            errors[d["seq"]] = f"depends on #{seq}, which is not in this plan"
+    return results, errors
@@ -0,0 +1,173 @@
+import html, threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from utils.tasks import TaskIndex, chunk_ranges
+from utils.adf import chunk_title, row_json, tasks_page_doc_json
+
+HEADER_MAP = {
+    "Task ID":"ID","Task Title":"Title","Task Description":"Desc","Complexity":"CX",
+    "Primary Role":"Role","Predecessors":"Dep","Client Dependencies":"Client Deps",
+    "Deliverables":"Deliverables","Acceptance Criteria":"Acceptance",
+    "ID":"ID","Title":"Title","Desc":"Desc","CX":"CX","Role":"Role","Dep":"Dep",
+    "Client Deps":"Client Deps","Acceptance":"Acceptance",
+}
+DROP_COLS = {"Orchestration Integration","Monitoring & Alerting","Schedule / Frequency"}
+# CSV columns of the storage table, in display order, when present
+PREFERRED = [
+    "Task ID","Task Title","Task Description","Complexity","Primary Role","Notes",
+    "Predecessors","Client Dependencies","Deliverables","Acceptance Criteria",
+    "MVP","Production","Enterprise",
+]
+SHORT_KEYS = ["ID","Title","Desc","CX","Role","Dep","Client Deps","Deliverables","Acceptance"]
+WIDTHS = {  # % hints (Confluence honors <colgroup> in storage XHTML)
+    "ID": 8, "Title": 18, "Desc": 34, "Role": 8, "CX": 6, "Dep": 8,
+    "Client Deps": 10, "Deliverables": 8, "Acceptance": 10,
+}
+CX_LONG = {"L":"Low","M":"Medium","H":"High"}
+
+Budget = Tuple[int, int]  # (max rows, max bytes) per table, 0 = no limit
+
+
+def cx_code(v: str) -> str:
+    """Normalize complexity to codes: L, M, H (fallback to original)."""
+    m = (v or "").strip().lower()
+    return {"low":"L","l":"L","medium":"M","m":"M","high":"H","h":"H"}.get(m, (v or "").strip())
+
+
+def desc_html(v: str) -> str:
+    """A task description as storage XHTML, from the same markdown parse as its ADF cell (utils.adf.adf_desc_td)."""
+    if not v or v.lstrip().startswith("<"):
+        return html.escape(v)
+    from utils.markdown import convert
+    xhtml, blocks = convert(v)
+    if len(blocks) == 1 and blocks[0]["type"] == "paragraph":
+        return xhtml[3:-4]  # a single paragraph goes into the cell bare, as plain text always did
+    return xhtml
+
+
+class TaskTable:
+    """
+    The tasks of one OptionRef, normalized once for every renderer: each row is keyed by the
+    short column names (ID, Title, Desc, CX, ...), values are stripped strings and CX is the
+    L/M/H code. columns lists the short keys the storage table shows, in display order.
+    """
+    __slots__ = ("option_ref", "columns", "rows")
+
+    def __init__(self, option_ref: str, task_rows: List[Dict[str, str]]):
+        present = task_rows[0].keys() if task_rows else ()
+        self.option_ref = option_ref
+        self.columns = [HEADER_MAP.get(c, c) for c in PREFERRED if c in present and c not in DROP_COLS]
+        extra = [c for c in self.columns if c not in SHORT_KEYS]
+        self.rows = []
+        for s in task_rows:
+            r = dict.fromkeys(SHORT_KEYS, "")
+            for src, tgt in HEADER_MAP.items():
+                if src in s and src not in DROP_COLS: r[tgt] = str(s[src]).strip()
+            for c in extra:
+                r[c] = str(s[c]).strip()
+            r["CX"] = cx_code(r["CX"])
+            self.rows.append(r)
+
+
+class TaskTables:
+    """TaskTable per OptionRef of a tasks source, built on first use and kept for the run (LRU-bounded)."""
+
+    def __init__(self, tasks: TaskIndex, size: int = 256):
+        self.tasks = tasks
+        self.size = size
+        self._tables: "OrderedDict[str, TaskTable]" = OrderedDict()
+        self._lock = threading.Lock()  # render threads share one cache
+
+    def get(self, option_ref: str) -> TaskTable:
+        ref = option_ref.strip()
+        with self._lock:
+            table = self._tables.get(ref)
+            if table is not None:
+                self._tables.move_to_end(ref)
+                return table
+        table = TaskTable(ref, self.tasks.get(ref, []))
+        with self._lock:
+            self._tables[ref] = table
+            if len(self._tables) > self.size:
+                self._tables.popitem(last=False)
+        return table
+
+
+# --- Backends ---------------------------------------------------------------------------------
+# A backend serializes a TaskTable's rows to fragments (whose byte sizes drive chunking) and
+# renders the table part of a Tasks page within a budget: the whole table, one table per chunk
+# in expand sections, or only chunk `part` (1-based) for split pages.
+
+class StorageBackend:
+    @staticmethod
+    def row_fragments(table: TaskTable) -> List[str]:
+        out = []
+        for r in table.rows:
+            tds = []
+            for c in table.columns:
+                v = r[c]
+                if c == "CX":
+                    tds.append(f'<td><span title="{html.escape(CX_LONG.get(v, v))}">{html.escape(v)}</span></td>')
+                elif c == "Desc":
+                    tds.append(f"<td>{desc_html(v)}</td>")
+                else:
+                    tds.append(f"<td>{html.escape(v)}</td>")
+            out.append("<tr>" + "".join(tds) + "</tr>")
+        return out
+
+    @staticmethod
+    def sizes(fragments: List[str]) -> List[int]:
+        return [len(f.encode("utf-8")) for f in fragments]
+
+    @staticmethod
+    def _table(table: TaskTable, fragments: List[str]) -> str:
+        # Width hints (no inline CSS); <small> shrinks font universally (works even if styles are stripped)
+        colgroup = "".join(f'<col width="{WIDTHS.get(c, 8)}%"/>' for c in table.columns)
+        thead = "".join(f"<th>{html.escape(c)}</th>" for c in table.columns)
+        return (f"<small><table><colgroup>{colgroup}</colgroup><thead><tr>{thead}</tr></thead>"
+                f"<tbody>{''.join(fragments)}</tbody></table></small>")
+
+    @classmethod
+    def render(cls, table: TaskTable, budget: Budget = (0, 0), part: int = 0) -> str:
+        if not table.rows:
+            return f"<p><em>No tasks found for OptionRef {html.escape(table.option_ref)}.</em></p>"
+        fragments = cls.row_fragments(table)
+        ranges = chunk_ranges(cls.sizes(fragments), *budget)
+        if part:
+            a, b = ranges[part - 1] if part <= len(ranges) else (0, 0)
+            return cls._table(table, fragments[a:b])
+        if len(ranges) == 1:
+            return cls._table(table, fragments)
+        return "".join(
+            f'<ac:structured-macro ac:name="expand"><ac:parameter ac:name="title">{html.escape(chunk_title(a, b, len(fragments)))}'
+            f"</ac:parameter><ac:rich-text-body>{cls._table(table, fragments[a:b])}</ac:rich-text-body></ac:structured-macro>"
+            for a, b in ranges)
+
+
+class AdfBackend:
+    @staticmethod
+    def row_fragments(table: TaskTable) -> List[str]:
+        return [row_json(r) for r in table.rows]
+
+    @staticmethod
+    def sizes(fragments: List[str]) -> List[int]:
+        return [len(f) for f in fragments]  # ensure_ascii JSON: characters are bytes
+
+    @classmethod
+    def render(cls, table: TaskTable, budget: Budget = (0, 0), part: int = 0) -> str:
+        """The whole tasks page document (legend and table), serialized."""
+        if part:
+            ranges = chunk_ranges(cls.sizes(cls.row_fragments(table)), *budget)
+            a, b = ranges[part - 1] if part <= len(ranges) else (0, 0)
+            return tasks_page_doc_json(table.option_ref, table.rows[a:b])
+        return tasks_page_doc_json(table.option_ref, table.rows, *budget)
+
+
+BACKENDS = {"storage": StorageBackend, "adf": AdfBackend}
+
+
+def part_count(table: TaskTable, backend, budget: Budget) -> int:
+    """How many pages the table needs to keep each within budget."""
+    if not table.rows:
+        return 1
+    return len(chunk_ranges(backend.sizes(backend.row_fragments(table)), *budget))
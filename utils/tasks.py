@@ -0,0 +1,41 @@
+import os, csv, json
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# The tasks CSV as the renderers use it: {OptionRef: [row, ...]} in file order, every value a
+# string ("" for empty cells). Plain csv keeps pandas off the import path.
+TaskIndex = Dict[str, List[Dict[str, str]]]
+
+
+def load_task_index(path: str) -> TaskIndex:
+    """Read the tasks CSV grouped by (stripped) OptionRef; empty if path is unset or missing."""
+    groups: TaskIndex = defaultdict(list)
+    if not path or not os.path.isfile(path): return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            row = {k: (v or "") for k, v in r.items() if k is not None}
+            groups[row.get("OptionRef", "").strip()].append(row)
+    return dict(groups)
+
+
+def task_fingerprints(tasks) -> Dict[str, str]:
+    """{OptionRef: digest of its task rows} for a TaskIndex or a TasksStore, to spot edited options."""
+    if hasattr(tasks, "digests"):
+        return tasks.digests()
+    import hashlib  # only --watch needs digests; loading OpenSSL is a visible share of startup
+    return {ref: hashlib.sha1(json.dumps(rows, sort_keys=True).encode()).hexdigest() for ref, rows in tasks.items()}
+
+
+def chunk_ranges(sizes: List[int], max_rows: int = 0, max_bytes: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split consecutive rows of the given sizes into (start, end) ranges that stay within max_rows
+    rows and max_bytes bytes each (0 = no limit). A single row over max_bytes gets a range of its own.
+    """
+    ranges, start, used = [], 0, 0
+    for i, size in enumerate(sizes):
+        if i > start and ((max_rows and i - start >= max_rows) or (max_bytes and used + size > max_bytes)):
+            ranges.append((start, i))
+            start, used = i, 0
+        used += size
+    ranges.append((start, len(sizes)))
+    return ranges
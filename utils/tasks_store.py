@@ -0,0 +1,143 @@
+import os, csv, json, sqlite3, hashlib, threading
+from typing import Dict, List, Iterator, Optional, Any
+
+SCHEMA_VERSION = 2
+SEP = "\x1f"  # ASCII unit separator between a row's cell values; never appears in CSV text
+
+
+class TasksStore:
+    """
+    The tasks CSV in SQLite, for catalogs too large to hold in memory. Rows are streamed in
+    chunks on import and indexed on OptionRef and Task ID; renderers fetch one option's rows at
+    a time through the same get(option_ref, default) interface as a TaskIndex dict.
+
+    open() reuses the database while the CSV's size and mtime match the last import. Each
+    thread gets its own read connection, and a pickled store reconnects by path, so render
+    worker processes can share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @classmethod
+    def open(cls, path: str, csv_path: str, chunk_rows: int = 5000) -> "TasksStore":
+        store = cls(path)
+        if store.is_stale(csv_path):
+            store.import_csv(csv_path, chunk_rows)
+        return store
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+                "CREATE TABLE IF NOT EXISTS tasks (option_ref TEXT, task_id TEXT, pos INTEGER, row TEXT);"
+                "CREATE TABLE IF NOT EXISTS refs (option_ref TEXT PRIMARY KEY, n INTEGER, digest TEXT);")
+            self._create_indexes(conn)
+        return conn
+
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection):
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_ref ON tasks (option_ref, pos)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_id ON tasks (task_id)")
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._local = threading.local()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _source_stamp(csv_path: str) -> str:
+        st = os.stat(csv_path)
+        return json.dumps([SCHEMA_VERSION, os.path.abspath(csv_path), st.st_size, st.st_mtime_ns])
+
+    def is_stale(self, csv_path: str) -> bool:
+        if not os.path.isfile(csv_path):
+            return self._meta("source") is not None  # the CSV went away: drop what we had
+        return self._meta("source") != self._source_stamp(csv_path)
+
+    def import_csv(self, csv_path: str, chunk_rows: int = 5000) -> int:
+        """Replace the store's contents with csv_path, chunk_rows rows per insert batch."""
+        conn = self._conn()
+        digests: Dict[str, Any] = {}
+        counts: Dict[str, int] = {}
+        n = 0
+        conn.execute("PRAGMA synchronous=OFF")  # a crash mid-import leaves no "source" stamp, so it reimports
+        with conn:
+            # Bulk load without indexes, then build them once: far faster than maintaining them per row.
+            conn.execute("DROP INDEX IF EXISTS tasks_ref")
+            conn.execute("DROP INDEX IF EXISTS tasks_id")
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM refs")
+            conn.execute("DELETE FROM meta")
+            if not os.path.isfile(csv_path):
+                self._create_indexes(conn)
+                return 0
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                columns = next(reader, [])
+                ref_i = columns.index("OptionRef") if "OptionRef" in columns else None
+                id_i = columns.index("Task ID") if "Task ID" in columns else None
+                batch = []
+                for values in reader:
+                    values = (values + [""] * len(columns))[:len(columns)]
+                    ref = values[ref_i].strip() if ref_i is not None else ""
+                    encoded = SEP.join(values)
+                    digests.setdefault(ref, hashlib.sha1()).update(encoded.encode())
+                    counts[ref] = counts.get(ref, 0) + 1
+                    batch.append((ref, values[id_i].strip() if id_i is not None else "", n, encoded))
+                    n += 1
+                    if len(batch) >= chunk_rows:
+                        conn.executemany("INSERT INTO tasks VALUES (?,?,?,?)", batch)
+                        batch.clear()
+                conn.executemany("INSERT INTO tasks VALUES (?,?,?,?)", batch)
+            self._create_indexes(conn)
+            conn.executemany("INSERT INTO refs VALUES (?,?,?)",
+                             [(ref, counts[ref], d.hexdigest()) for ref, d in digests.items()])
+            conn.executemany("INSERT INTO meta VALUES (?,?)",
+                             [("source", self._source_stamp(csv_path)), ("columns", json.dumps(columns))])
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.columns = columns
+        return n
+
+    def columns(self) -> List[str]:
+        cols = getattr(self._local, "columns", None)
+        if cols is None:
+            cols = self._local.columns = json.loads(self._meta("columns") or "[]")
+        return cols
+
+    def get(self, option_ref: str, default=None) -> List[Dict[str, str]]:
+        cols = self.columns()
+        rows = [dict(zip(cols, r.split(SEP))) for (r,) in self._conn().execute(
+            "SELECT row FROM tasks WHERE option_ref=? ORDER BY pos", (option_ref,))]
+        return rows if rows else default
+
+    def find_task(self, task_id: str) -> Optional[Dict[str, str]]:
+        row = self._conn().execute("SELECT row FROM tasks WHERE task_id=? LIMIT 1", (task_id,)).fetchone()
+        return dict(zip(self.columns(), row[0].split(SEP))) if row else None
+
+    def digests(self) -> Dict[str, str]:
+        """{OptionRef: digest of its rows}; cheap change detection without loading rows."""
+        return dict(self._conn().execute("SELECT option_ref, digest FROM refs"))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([r for (r,) in self._conn().execute("SELECT option_ref FROM refs ORDER BY option_ref")])
+
+    def __contains__(self, option_ref: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM refs WHERE option_ref=?", (option_ref,)).fetchone() is not None
+
+    def __bool__(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM refs LIMIT 1").fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM refs").fetchone()[0]
@@ -0,0 +1,98 @@
+import json
+from typing import Optional, Dict, Any
+
+# A transport sends one HTTP request and returns an object with the requests.Response surface
+# ConfluenceAPI relies on: status_code, headers, content, ok, json(), raise_for_status().
+# Failures to get any response raise requests.RequestException, whatever the backend.
+
+
+class RequestsTransport:
+    """requests.Session with a connection pool large enough for the worker count."""
+    name = "requests"
+
+    def __init__(self, email: str, api_token: str, pool_size: int = 32):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        self.session.auth = (email, api_token)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kw):
+        return self.session.request(method, url, **kw)
+
+    def close(self):
+        self.session.close()
+
+
+class _HttpxResponse:
+    """Adapts httpx.Response to the requests.Response surface (ok, requests.HTTPError)."""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.content = resp.content
+        self.url = str(resp.url)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self._resp.text
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class Http2Transport:
+    """
+    httpx client speaking HTTP/2: concurrent requests share a few multiplexed connections
+    instead of one TCP+TLS connection each. Needs `pip install httpx[http2]`.
+    prior_knowledge skips ALPN and speaks h2c on plain http:// (local stand-in server).
+    """
+    name = "http2"
+
+    def __init__(self, email: str, api_token: str, max_connections: int = 4, prior_knowledge: bool = False):
+        try:
+            import httpx
+        except ImportError:
+            raise SystemExit("The http2 transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        self._httpx = httpx
+        self.client = httpx.Client(
+            http2=True, http1=not prior_knowledge, auth=(email, api_token),
+            headers={'Content-Type': 'application/json'},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def request(self, method: str, url: str, json: Any = None, headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None, **kw):
+        import requests
+        try:
+            resp = self.client.request(method, url, json=json, headers=headers, timeout=timeout, **kw)
+        except self._httpx.TimeoutException as e:
+            raise requests.Timeout(str(e))
+        except self._httpx.TransportError as e:
+            raise requests.ConnectionError(str(e))
+        return _HttpxResponse(resp)
+
+    def close(self):
+        self.client.close()
+
+
+TRANSPORTS = {"requests": RequestsTransport, "http2": Http2Transport}
+
+
+def make_transport(name: str, email: str, api_token: str, **kw):
+    if name not in TRANSPORTS:
+        raise SystemExit(f"Unknown transport {name!r}; choose one of: {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name](email, api_token, **kw)
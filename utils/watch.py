@@ -0,0 +1,81 @@
+import os, time
+from typing import Dict, List, Optional, Set, Tuple
+from utils.plan_row import PlanRow
+
+
+class FileWatcher:
+    """
+    Blocks until one of the watched files changes. Uses inotify (via the optional inotify_simple
+    package) when available, otherwise polls (mtime, size) every `interval` seconds. A change is
+    reported once the files have been quiet for `settle` seconds, so an editor's save that
+    truncates and rewrites in several steps is seen as one change.
+    """
+
+    def __init__(self, paths: List[str], interval: float = 1.0, settle: float = 0.3):
+        self.paths = [os.path.abspath(p) for p in paths if p]
+        self.interval = interval
+        self.settle = settle
+        self._seen = self._stamp()
+        self._inotify = None
+        try:
+            from inotify_simple import INotify, flags
+            self._inotify = INotify()
+            mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+            for d in {os.path.dirname(p) for p in self.paths}:
+                self._inotify.add_watch(d, mask)  # watch directories: editors often replace the file
+        except (ImportError, OSError):
+            self._inotify = None
+        self.backend = "inotify" if self._inotify else "polling"
+
+    def _stamp(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        out = {}
+        for p in self.paths:
+            try:
+                st = os.stat(p)
+                out[p] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                out[p] = None
+        return out
+
+    def _changed(self) -> Set[str]:
+        now = self._stamp()
+        return {p for p in self.paths if now[p] != self._seen.get(p)}
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Return the set of changed paths (empty on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._inotify:
+                self._inotify.read(timeout=int(self.interval * 1000))
+            else:
+                time.sleep(self.interval)
+            changed = self._changed()
+            if changed:
+                while True:  # let the writer finish
+                    before = self._stamp()
+                    time.sleep(self.settle)
+                    if self._stamp() == before: break
+                self._seen = self._stamp()
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+
+def changed_rows(old: List[PlanRow], new: List[PlanRow]) -> List[PlanRow]:
+    """Rows of new that are added or differ from old (matched by Page Title). Removed rows are ignored."""
+    before = {(r.title or "").strip(): r for r in old}
+    return [r for r in new if before.get((r.title or "").strip()) != r]
+
+
+def changed_option_refs(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    """OptionRefs whose task rows were added, removed or edited, from two task_fingerprints() maps."""
+    return {ref for ref in set(old) | set(new) if old.get(ref) != new.get(ref)}
+
+
+def retry_titles(failed: List[PlanRow]) -> Set[str]:
+    """Plan titles to push again for rows whose pages failed; a part page "<title> (k/n)" comes from its Tasks row."""
+    titles = set()
+    for r in failed:
+        part = r.get("Part") or ""
+        titles.add(((r.parent_page if part and not part.startswith("1/") else r.title) or "").strip())
+    return titles
@@ -1,46 +1,212 @@
-import os, json, argparse, csv
+import os, re, csv, sys, json, argparse
 from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, List
+
+# Checks, each issue a flat dict {"check": name, ...}. Errors make the exit status 1.
+ERRORS = ("missing_title", "missing_parent", "page_cycle", "duplicate_task_id", "unknown_predecessor", "task_cycle")
+WARNINGS = ("duplicate_title", "option_without_tasks", "orphan_option_ref")
+_SPLIT = re.compile(r"[,;\s]+")
+_MULTI = re.compile(r"[,;\s]")
+
+
+def find_cycles(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Cycles of a directed graph ({node: [successors]}; successors missing from it are leaves),
+    each reported once as the path that closes it. Nodes no cycle can reach are peeled off first
+    (Kahn's algorithm), then an iterative DFS walks what is left; every node and edge is visited
+    at most twice.
+    """
+    indegree = dict(Counter(chain.from_iterable(graph.values())))
+    peeled = [n for n in graph if n not in indegree]
+    for n in peeled:  # grows while iterating
+        for s in graph[n]:
+            d = indegree[s] - 1
+            indegree[s] = d
+            if not d and s in graph: peeled.append(s)
+    if len(peeled) == len(graph):
+        return []
+    state: Dict[str, int] = dict.fromkeys(peeled, 2)  # 1 = on the current path, 2 = done
+    cycles = []
+    end = object()
+    for start in graph:
+        if start in state: continue
+        path, pos, stack = [start], {start: 0}, [iter(graph[start])]
+        state[start] = 1
+        while stack:
+            nxt = next(stack[-1], end)
+            if nxt is end:
+                stack.pop()
+                node = path.pop()
+                del pos[node]
+                state[node] = 2
+            elif nxt not in state:
+                state[nxt] = 1
+                pos[nxt] = len(path)
+                path.append(nxt)
+                stack.append(iter(graph.get(nxt, ())))
+            elif state[nxt] == 1:
+                cycles.append(path[pos[nxt]:])
+    return cycles
+
+
+def load_override_titles(paths: Iterable[str]) -> set:
+    titles = set()
+    for path in paths:
+        if path and os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                titles.update(t.strip() for t in json.load(f))
+    return titles
+
+
+def scan_tasks(path: str) -> Dict[str, Any]:
+    """
+    The tasks CSV reduced, in one streaming pass, to what the checks read: the task count per
+    OptionRef, every Task ID in file order, and {Task ID: [predecessors]} for the tasks that
+    have any.
+    """
+    refs: Counter = Counter()
+    ids: List[str] = []
+    deps: Dict[str, List[str]] = {}
+    if not path or not os.path.isfile(path):
+        return {"refs": refs, "ids": ids, "deps": deps}
+    with open(path, newline='', encoding='utf-8') as f:
+        for r in csv.DictReader(f):
+            refs[(r.get("OptionRef") or "").strip()] += 1
+            tid = (r.get("Task ID") or "").strip()
+            if not tid: continue
+            ids.append(tid)
+            pred = (r.get("Predecessors") or "").strip()
+            if pred:
+                ds = [d for d in _SPLIT.split(pred) if d] if _MULTI.search(pred) else [pred]
+                if tid in deps: deps[tid] += ds
+                else: deps[tid] = ds
+    return {"refs": refs, "ids": ids, "deps": deps}
+
+
+def check_plan(rows: List[Dict[str, Any]], tasks: Dict[str, Any], known_parents: set) -> List[Dict[str, Any]]:
+    """
+    All issues of a plan (its JSON rows, as loaded) and its tasks (scan_tasks()), in one pass
+    over each plus the two cycle searches.
+    """
+    issues: List[Dict[str, Any]] = []
+    all_titles = []
+    parents: Dict[str, List[str]] = {}
+    codes, task_codes, options = set(), set(), []
+    for r in rows:
+        t = (r.get("Page Title") or '').strip()
+        if not t:
+            issues.append({"check": "missing_title", "row": r})
+            continue
+        p = (r.get("Parent Page") or '').strip()
+        code = (r.get("Code / Ref") or '').strip()
+        all_titles.append(t)
+        if t in parents:
+            if p: parents[t].append(p)
+        else:
+            parents[t] = [p] if p else []
+        if code: codes.add(code)
+        page_type = r.get("Page Type")
+        if page_type == "Tasks": task_codes.add(code)
+        elif page_type == "Option": options.append((t, code))
+
+    titles = Counter(all_titles)
+    for t, c in titles.items():
+        if c > 1: issues.append({"check": "duplicate_title", "title": t, "count": c})
+    missing: Dict[str, List[str]] = {}
+    for t, ps in parents.items():
+        for p in ps:
+            if p not in titles and p not in known_parents:
+                missing.setdefault(p, []).append(t)
+    issues += [{"check": "missing_parent", "parent": p, "children": ch} for p, ch in missing.items()]
+    issues += [{"check": "page_cycle", "titles": c} for c in find_cycles(parents)]
+    issues += [{"check": "option_without_tasks", "title": t, "code": code}
+               for t, code in options if code not in task_codes]
+
+    for ref, n in tasks["refs"].items():
+        if ref and ref not in codes:
+            issues.append({"check": "orphan_option_ref", "option_ref": ref, "tasks": n})
+    ids = Counter(tasks["ids"])
+    for tid, c in ids.items():
+        if c > 1: issues.append({"check": "duplicate_task_id", "task_id": tid, "count": c})
+    deps = tasks["deps"]  # only tasks with predecessors: the others can't be on a cycle
+    for tid, ds in deps.items():
+        unknown = [d for d in ds if d not in ids]
+        if unknown: issues.append({"check": "unknown_predecessor", "task_id": tid, "predecessors": unknown})
+    issues += [{"check": "task_cycle", "task_ids": c} for c in find_cycles(deps)]
+    return issues
+
 
 def main():
-    ap = argparse.ArgumentParser()
+    ap = argparse.ArgumentParser(description="Check a page creation plan and its tasks before syncing.")
     ap.add_argument('--plan', default='data/Confluence_Page_Creation_Plan.json')
+    ap.add_argument('--tasks', default='data/Blueprint_Tasks_Mapped_To_OptionRefs.csv')
+    ap.add_argument('--root', default=os.getenv("CONFLUENCE_ROOT_PARENT", "LEIT Data Platform Blueprint"))
+    ap.add_argument('--overrides', nargs='*', default=['data/parent_overrides.json', 'data/parent_title_overrides.json'],
+                    help='JSON files of {title: {"id": ...}} for parents that exist outside the plan')
+    ap.add_argument('--json', action='store_true', help='Print the results as JSON')
     args = ap.parse_args()
 
-    with open(args.plan) as f:
-        rows = json.load(f)
-
-    # Basic checks
-    errors = []
-    titles = Counter()
-    parents = Counter()
-    bad = []
+    with open(args.plan, encoding='utf-8') as f:
+        rows = json.load(f)  # plain dicts: the checks read four columns, PlanRow would cost more than them
+    tasks = scan_tasks(args.tasks)
+    known = load_override_titles(args.overrides) | {args.root.strip()}
+    issues = check_plan(rows, tasks, known)
+    errors = [i for i in issues if i["check"] in ERRORS]
+    status = 1 if errors else 0
 
-    for r in rows:
-        t = (r.get('Page Title') or '').strip()
-        p = (r.get('Parent Page') or '').strip()
-        k = (r.get('Page Type') or '').strip()
-        if not t: bad.append(('Missing Title', r))
-        titles[t] += 1
-        parents[p] += 1
+    if args.json:
+        counts = Counter(i["check"] for i in issues)
+        print(json.dumps({"plan_rows": len(rows), "tasks": sum(tasks["refs"].values()),
+                          "counts": {c: counts.get(c, 0) for c in ERRORS + WARNINGS},
+                          "errors": errors, "warnings": [i for i in issues if i["check"] in WARNINGS]},
+                         indent=2, ensure_ascii=False))
+        return status
 
+    by_check: Dict[str, List[Dict[str, Any]]] = {}
+    for i in issues:
+        by_check.setdefault(i["check"], []).append(i)
     print('=== Title Dupes (should generally be unique) ===')
-    for t, c in titles.most_common():
-        if c > 1:
-            print(f'  {c}x: {t}')
+    for i in sorted(by_check.get("duplicate_title", []), key=lambda i: -i["count"]):
+        print(f'  {i["count"]}x: {i["title"]}')
 
     print('\n=== Parent Titles (ensure these exist in Confluence) ===')
-    for p, c in parents.items():
+    children = Counter((r.get('Parent Page') or '').strip() for r in rows)
+    for p, c in children.items():
         if p:
             print(f'  {c} children -> {p}')
 
+    sections = [
+        ("missing_parent", "Parents missing from the plan and overrides",
+         lambda i: f'{i["parent"]} <- {len(i["children"])} children, e.g. {i["children"][0]}'),
+        ("page_cycle", "Page parent cycles", lambda i: " -> ".join(i["titles"] + i["titles"][:1])),
+        ("option_without_tasks", "Options without a Tasks page", lambda i: f'{i["code"]}: {i["title"]}'),
+        ("orphan_option_ref", "Tasks CSV OptionRefs with no plan row", lambda i: f'{i["option_ref"]} ({i["tasks"]} tasks)'),
+        ("duplicate_task_id", "Duplicate Task IDs", lambda i: f'{i["count"]}x: {i["task_id"]}'),
+        ("unknown_predecessor", "Predecessors that are not tasks",
+         lambda i: f'{i["task_id"]} <- {", ".join(i["predecessors"])}'),
+        ("task_cycle", "Task dependency cycles", lambda i: " -> ".join(i["task_ids"] + i["task_ids"][:1])),
+    ]
+    for check, heading, fmt in sections:
+        found = by_check.get(check, [])
+        if found:
+            print(f'\n=== {heading} ({len(found)}) ===')
+            for i in found[:20]:
+                print(f'  {fmt(i)}')
+            if len(found) > 20:
+                print(f'  ... {len(found) - 20} more (--json lists all)')
+
+    bad = by_check.get("missing_title", [])
     if bad:
         print('\n=== Rows with issues ===')
-        for why, r in bad[:10]:
-            print(why, r)
+        for i in bad[:10]:
+            print('Missing Title', i["row"])
 
-    print('\nCheck complete. If parent titles differ in Confluence, either:')
+    print(f'\n{len(errors)} errors, {len(issues) - len(errors)} warnings.')
+    print('Check complete. If parent titles differ in Confluence, either:')
     print(' - bulk find/replace in the JSON to match, or')
     print(' - pass --root "LEIT Data Platform Blueprint" to run.py for fallback.')
+    return status
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())